@@ -0,0 +1,178 @@
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
+import asyncio
+import logging
+from WikiraceAPI.wikiSearch import find_wikipedia_path, find_wikipedia_paths, SearchDeadlineExceeded, path_cache
+from WikiraceAPI.titles import normalize_title
+from WikiraceAPI.searchMetrics import SearchMetrics
+from WikiraceAPI.fetchBackends import rate_limiter, link_cache, backlink_cache, page_store
+from WikiraceAPI.graphIndex import get_graph_index
+from WikiraceAPI.httpPool import http_pool
+from WikiraceAPI.fetchScheduler import fetch_scheduler
+from WikiraceAPI.extractPool import extract_pool
+from WikiraceAPI.searchStream import stream_search, STREAM_MEDIA_TYPES, STREAM_HEADERS
+from WikiraceAPI.searchJobs import JobRunner, job_store_from_env
+
+# Shared by both entry points: main.py (Lambda, through Mangum) and fastestPath.py (container)
+app = FastAPI(title="Wikipedia Path Finder")
+
+# ---------- Models ----------
+class WikiPathRequest(BaseModel):
+    start: str
+    end: str
+    mode: Literal["bfs", "bidirectional", "guided", "deepening", "offline"] = "bfs"
+    backend: Optional[Literal["api", "html"]] = None
+    # Seconds; when it passes, the furthest partial path found so far is returned
+    deadline: Optional[float] = Field(None, gt=0)
+    # Pages expanded per round in guided mode
+    beam_width: Optional[int] = Field(None, gt=0, le=500)
+    # Extra hops over the landmark lower bound a precomputed hub path may have
+    landmark_tolerance: Optional[int] = Field(None, ge=0)
+    # Levels searched before giving up with a 422; defaults to MAX_DEPTH
+    max_depth: Optional[int] = Field(None, gt=0, le=12)
+    # Megabytes of frontier and parent pointers a deepening search keeps in memory before spilling to disk;
+    # titles and cached links are bounded process-wide instead
+    frontier_budget_mb: Optional[int] = Field(None, gt=0)
+
+class PagePair(BaseModel):
+    start: str
+    end: str
+
+class WikiPathBatchRequest(BaseModel):
+    pairs: List[PagePair] = Field(..., min_items=1, max_items=500)
+    mode: Literal["bfs", "offline"] = "bfs"
+    backend: Optional[Literal["api", "html"]] = None
+    # Seconds for the whole batch; unfinished pairs get the furthest partial path
+    deadline: Optional[float] = Field(None, gt=0)
+    max_depth: Optional[int] = Field(None, gt=0, le=12)
+
+# ---------- Logging Configuration ----------
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+logger = logging.getLogger(__name__)
+
+job_runner = JobRunner(job_store_from_env())
+
+# ---------- Lifecycle ----------
+@app.on_event("startup")
+async def open_http_pool():
+    await http_pool.get_session()
+    await extract_pool.warm_up()
+    job_runner.start(lambda request: search_path(WikiPathRequest(**request)))
+
+@app.on_event("shutdown")
+async def close_http_pool():
+    await job_runner.stop()
+    await http_pool.close()
+
+# ---------- API Endpoints ----------
+@app.get("/health")
+async def health_check():
+    """Health check endpoint for ALB"""
+    return {"status": "healthy", "path_cache": path_cache.stats()}
+
+@app.get("/metrics")
+async def metrics():
+    """Rate limiter, link cache and page store state for this container"""
+    return {
+        "rate_limiter": rate_limiter.metrics(),
+        "link_cache": link_cache.stats(),
+        "backlink_cache": backlink_cache.stats(),
+        "page_store": page_store.stats(),
+        "http_pool": http_pool.metrics(),
+        "fetch_scheduler": fetch_scheduler.stats(),
+        "path_cache": path_cache.stats(),
+    }
+
+def check_mode(request):
+    if request.mode == "offline" and get_graph_index() is None:
+        raise HTTPException(status_code=503, detail="Offline graph index is not loaded")
+
+async def search_path(request, progress=None, debug=False, metrics=None):
+    """The response body for `request`; with `debug`, it includes the search's metrics."""
+    metrics = metrics if metrics is not None else SearchMetrics()
+    try:
+        path = await find_wikipedia_path(request.start, request.end, mode=request.mode, backend=request.backend,
+                                         deadline=request.deadline, beam_width=request.beam_width,
+                                         tolerance=request.landmark_tolerance, progress=progress, metrics=metrics,
+                                         max_depth=request.max_depth, frontier_budget_mb=request.frontier_budget_mb)
+    except SearchDeadlineExceeded as e:
+        result = {"path": e.partial_path, "length": len(e.partial_path), "partial": True}
+    else:
+        if path:
+            result = {"path": path, "length": len(path)}
+        elif path is None:
+            raise HTTPException(status_code=422, detail="Search terminated due to excessive depth")
+        else:
+            raise HTTPException(status_code=404, detail="No path found")
+    if debug:
+        result["debug"] = metrics.as_dict()
+    return result
+
+@app.post("/find-path")
+async def find_path(request: WikiPathRequest, debug: bool = False):
+    check_mode(request)
+    return await search_path(request, debug=debug)
+
+def batch_result(pair, path):
+    """One pair's entry in a batch response, shaped like /find-path's body or error."""
+    if isinstance(path, SearchDeadlineExceeded):
+        return {**pair, "path": path.partial_path, "length": len(path.partial_path), "partial": True}
+    if path:
+        return {**pair, "path": path, "length": len(path)}
+    if path is None:
+        return {**pair, "error": {"status": 422, "detail": "Search terminated due to excessive depth"}}
+    return {**pair, "error": {"status": 404, "detail": "No path found"}}
+
+@app.post("/find-path/batch")
+async def find_path_batch(request: WikiPathBatchRequest, debug: bool = False):
+    """Paths for many pairs at once: one multi-target BFS per distinct start, all sharing fetches and caches"""
+    check_mode(request)
+    groups = {}
+    for pair in request.pairs:
+        groups.setdefault(normalize_title(pair.start), (pair.start, []))[1].append(pair.end)
+    if request.mode == "offline":
+        paths = {(pair.start, pair.end): await find_wikipedia_path(pair.start, pair.end, mode="offline") for pair in request.pairs}
+        return {"results": [batch_result(pair.dict(), paths[pair.start, pair.end]) for pair in request.pairs]}
+    metrics = [SearchMetrics() for _ in groups]
+    found = await asyncio.gather(*(
+        find_wikipedia_paths(start, ends, backend=request.backend, deadline=request.deadline, metrics=group_metrics,
+                             max_depth=request.max_depth)
+        for (start, ends), group_metrics in zip(groups.values(), metrics)
+    ))
+    paths = {(key, end): path for key, group_paths in zip(groups, found) for end, path in group_paths.items()}
+    response = {"results": [batch_result(pair.dict(), paths[normalize_title(pair.start), pair.end]) for pair in request.pairs]}
+    if debug:
+        response["debug"] = [group_metrics.as_dict() for group_metrics in metrics]
+    return response
+
+@app.post("/find-path/stream")
+async def find_path_stream(request: WikiPathRequest, format: Literal["ndjson", "sse"] = "ndjson", debug: bool = False):
+    """Per-level progress events, then a result or error event; disconnecting cancels the search"""
+    check_mode(request)
+    metrics = SearchMetrics()
+
+    async def search(progress):
+        try:
+            return {"event": "result", **await search_path(request, progress, debug, metrics)}
+        except HTTPException as e:
+            return {"event": "error", "status": e.status_code, "detail": e.detail}
+
+    return StreamingResponse(stream_search(search, metrics, format), media_type=STREAM_MEDIA_TYPES[format], headers=STREAM_HEADERS)
+
+@app.post("/find-path/jobs", status_code=202)
+async def create_find_path_job(request: WikiPathRequest):
+    """Queues a search, or joins an identical running or recently finished one"""
+    check_mode(request)
+    if not job_runner.running:
+        # Under Lambda nothing would run the job once this invocation returns
+        raise HTTPException(status_code=501, detail="Search jobs are only available on the container deployment")
+    return job_runner.submit(request.dict())
+
+@app.get("/find-path/jobs/{job_id}")
+async def get_find_path_job(job_id: str):
+    job = job_runner.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
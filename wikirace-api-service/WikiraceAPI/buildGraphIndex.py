@@ -0,0 +1,171 @@
+"""Builds the offline link-graph index used by the "offline" /find-path mode.
+
+From the English Wikipedia SQL dumps (page, pagelinks, and optionally
+linktarget and redirect):
+
+    python -m WikiraceAPI.buildGraphIndex /tmp/wikigraph \\
+        --page-sql enwiki-latest-page.sql.gz \\
+        --pagelinks-sql enwiki-latest-pagelinks.sql.gz \\
+        --linktarget-sql enwiki-latest-linktarget.sql.gz \\
+        --redirect-sql enwiki-latest-redirect.sql.gz
+
+From a tab-separated "source<TAB>target" title list, or a synthetic graph:
+
+    python -m WikiraceAPI.buildGraphIndex /tmp/wikigraph --edges-tsv links.tsv
+    python -m WikiraceAPI.buildGraphIndex /tmp/wikigraph --synthetic 10000
+"""
+from array import array
+import argparse
+import gzip
+import logging
+import random
+import re
+from WikiraceAPI.graphIndex import write_graph_index
+
+logger = logging.getLogger(__name__)
+
+# ---------- SQL Dump Rows ----------
+SQL_STRING = r"'((?:[^'\\]|\\.)*)'"
+# (page_id, page_namespace, page_title, page_is_redirect, ...
+PAGE_ROW = re.compile(rf"\((\d+),(-?\d+),{SQL_STRING},(\d),")
+# Pre-2024 pagelinks: (pl_from, pl_namespace, pl_title, pl_from_namespace)
+PAGELINK_TITLE_ROW = re.compile(rf"\((\d+),(-?\d+),{SQL_STRING},(-?\d+)\)")
+# Current pagelinks: (pl_from, pl_from_namespace, pl_target_id)
+PAGELINK_TARGET_ROW = re.compile(r"\((\d+),(-?\d+),(\d+)\)")
+# (lt_id, lt_namespace, lt_title)
+LINKTARGET_ROW = re.compile(rf"\((\d+),(-?\d+),{SQL_STRING}\)")
+# (rd_from, rd_namespace, rd_title, ...
+REDIRECT_ROW = re.compile(rf"\((\d+),(-?\d+),{SQL_STRING},")
+SQL_ESCAPE = re.compile(r"\\(.)")
+
+
+def sql_unescape(value):
+    return SQL_ESCAPE.sub(r"\1", value).replace("_", " ")
+
+
+def iter_sql_rows(path, pattern):
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            if line.startswith("INSERT INTO"):
+                yield from pattern.findall(line)
+
+
+def graph_from_sql(page_sql, pagelinks_sql, linktarget_sql=None, redirect_sql=None):
+    """Article (namespace 0) graph from the SQL dumps, with redirects followed.
+
+    Returns (titles, sources, targets, aliases), aliases mapping each
+    redirect title to the id of its article.
+    """
+    titles = []
+    id_by_page = {}
+    id_by_title = {}
+    redirect_pages = {}
+    for page_id, namespace, title, is_redirect in iter_sql_rows(page_sql, PAGE_ROW):
+        if namespace != "0":
+            continue
+        title = sql_unescape(title)
+        if is_redirect == "1":
+            redirect_pages[int(page_id)] = title
+            continue
+        id_by_page[int(page_id)] = id_by_title[title] = len(titles)
+        titles.append(title)
+    logger.info(f"Read {len(titles)} articles and {len(redirect_pages)} redirects")
+
+    aliases = {}
+    if redirect_sql:
+        for page_id, namespace, title in iter_sql_rows(redirect_sql, REDIRECT_ROW):
+            source = redirect_pages.get(int(page_id))
+            target = id_by_title.get(sql_unescape(title))
+            if namespace == "0" and source is not None and target is not None:
+                id_by_title[source] = aliases[source] = target
+
+    sources = array("i")
+    targets = array("i")
+    if linktarget_sql:
+        target_ids = {}
+        for target_id, namespace, title in iter_sql_rows(linktarget_sql, LINKTARGET_ROW):
+            if namespace == "0" and (node := id_by_title.get(sql_unescape(title))) is not None:
+                target_ids[int(target_id)] = node
+        for page_id, from_namespace, target_id in iter_sql_rows(pagelinks_sql, PAGELINK_TARGET_ROW):
+            source = id_by_page.get(int(page_id))
+            target = target_ids.get(int(target_id))
+            if source is not None and target is not None:
+                sources.append(source)
+                targets.append(target)
+    else:
+        for page_id, namespace, title, from_namespace in iter_sql_rows(pagelinks_sql, PAGELINK_TITLE_ROW):
+            if namespace != "0":
+                continue
+            source = id_by_page.get(int(page_id))
+            target = id_by_title.get(sql_unescape(title))
+            if source is not None and target is not None:
+                sources.append(source)
+                targets.append(target)
+    return titles, sources, targets, aliases
+
+
+def graph_from_tsv(path):
+    titles = []
+    ids = {}
+    sources = array("i")
+    targets = array("i")
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            ends = line.rstrip("\n").split("\t")
+            for title in ends:
+                if title not in ids:
+                    ids[title] = len(titles)
+                    titles.append(title)
+            if len(ends) == 2:
+                sources.append(ids[ends[0]])
+                targets.append(ids[ends[1]])
+    return titles, sources, targets
+
+
+def synthetic_graph(node_count, degree=20, seed=0):
+    """Random graph with a preferential-attachment skew, for fixtures and benchmarks."""
+    rng = random.Random(seed)
+    titles = [f"Page {i}" for i in range(node_count)]
+    sources = array("i")
+    targets = array("i")
+    # Targets drawn from earlier edge endpoints make a few hub pages collect most links
+    endpoints = list(range(node_count))
+    for source in range(node_count):
+        for _ in range(degree):
+            target = rng.choice(endpoints) if rng.random() < 0.5 else rng.randrange(node_count)
+            sources.append(source)
+            targets.append(target)
+            endpoints.append(target)
+    return titles, sources, targets
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("output", help="Directory to write the index to")
+    parser.add_argument("--page-sql")
+    parser.add_argument("--pagelinks-sql")
+    parser.add_argument("--linktarget-sql")
+    parser.add_argument("--redirect-sql")
+    parser.add_argument("--edges-tsv")
+    parser.add_argument("--synthetic", type=int, metavar="PAGES")
+    parser.add_argument("--degree", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.page_sql and args.pagelinks_sql:
+        graph = graph_from_sql(args.page_sql, args.pagelinks_sql, args.linktarget_sql, args.redirect_sql)
+    elif args.edges_tsv:
+        graph = graph_from_tsv(args.edges_tsv)
+    elif args.synthetic:
+        graph = synthetic_graph(args.synthetic, args.degree, args.seed)
+    else:
+        parser.error("Pass --page-sql and --pagelinks-sql, --edges-tsv, or --synthetic")
+    write_graph_index(args.output, *graph)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    main()
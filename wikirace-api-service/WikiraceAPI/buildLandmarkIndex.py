@@ -0,0 +1,24 @@
+"""Rebuilds the landmark (hub distance) index next to an offline graph index.
+
+Meant to run as a scheduled background job after each graph index build;
+running services pick up the new landmarks on their next search.
+
+    python -m WikiraceAPI.buildLandmarkIndex /tmp/wikigraph --hubs 16
+"""
+import argparse
+import logging
+from WikiraceAPI.graphIndex import GraphIndex
+from WikiraceAPI.landmarkIndex import write_landmark_index, HUB_COUNT
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("index", help="Graph index directory built by buildGraphIndex")
+    parser.add_argument("--hubs", type=int, default=HUB_COUNT)
+    args = parser.parse_args()
+    write_landmark_index(GraphIndex(args.index), args.hubs)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    main()
@@ -0,0 +1,86 @@
+"""Link extraction throughput on the event loop vs. in a pool of worker processes.
+
+Extracts links from synthetic article-sized pages, many at a time as a
+BFS level would, and reports pages/s for each worker count. It also
+reports the worst event-loop stall seen by a 10ms ticker. 0 workers
+extracts on the loop itself.
+
+    python -m WikiraceAPI.extractBenchmark --workers 0 1 2 4 --pages 400
+    python -m WikiraceAPI.extractBenchmark --extractor soup --pages 40
+"""
+import argparse
+import asyncio
+import os
+import random
+import time
+from WikiraceAPI.extractPool import ExtractPool
+from WikiraceAPI.linkExtractor import extract_links, EXTRACTORS
+
+TICK = 0.01
+
+
+def synthetic_page(links=1500, seed=0):
+    """About 350KB of article-like HTML with `links` anchors of the usual kinds."""
+    rng = random.Random(seed)
+    parts = ["<html><body><div id=\"mw-content-text\">"]
+    for i in range(links):
+        kind = rng.random()
+        if kind < 0.8:
+            href = f"/wiki/Article_{rng.randrange(10**6)}"
+        elif kind < 0.9:
+            href = f"/wiki/Special:Page_{i}"
+        else:
+            href = f"/wiki/Article_{i}#Section"
+        parts.append(f"<p>{'Lorem ipsum dolor sit amet. ' * 6}<a href=\"{href}\" title=\"Article {i}\">link {i}</a></p>")
+    parts.append("</div></body></html>")
+    return "".join(parts).encode("utf-8")
+
+
+async def max_loop_stall(stop):
+    worst = 0.0
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(TICK)
+        worst = max(worst, time.perf_counter() - started - TICK)
+    return worst
+
+
+async def run(workers, bodies, extractor):
+    pool = ExtractPool(workers)
+    await pool.warm_up()
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(max_loop_stall(stop))
+    await asyncio.sleep(TICK)
+    started = time.perf_counter()
+    if pool.enabled:
+        await asyncio.gather(*(pool.extract(body, extractor) for body in bodies))
+    else:
+        for body in bodies:
+            extract_links(body, extractor)
+            # What read_links does between chunks: give the loop a turn
+            await asyncio.sleep(0)
+    elapsed = time.perf_counter() - started
+    stop.set()
+    stall = await ticker
+    pool.close()
+    return len(bodies) / elapsed, stall
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[0, 1, 2, 4])
+    parser.add_argument("--pages", type=int, default=400)
+    parser.add_argument("--links", type=int, default=1500)
+    parser.add_argument("--extractor", choices=sorted(EXTRACTORS), default="stream")
+    args = parser.parse_args()
+
+    bodies = [synthetic_page(args.links, seed) for seed in range(args.pages)]
+    print(f"{len(bodies)} pages of {len(bodies[0]) // 1024}KB, {args.extractor} extractor, {os.cpu_count()} cores")
+    print(f"{'workers':>7} {'pages/s':>9} {'max loop stall (ms)':>20}")
+    for workers in args.workers:
+        pages_per_second, stall = asyncio.run(run(workers, bodies, args.extractor))
+        print(f"{workers:>7} {pages_per_second:>9.1f} {stall * 1000:>20.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+from concurrent.futures import ProcessPoolExecutor
+import os
+import atexit
+import asyncio
+import logging
+import multiprocessing
+from WikiraceAPI.linkExtractor import extract_links
+from WikiraceAPI.httpPool import decode_body
+from WikiraceAPI.searchMetrics import record
+
+logger = logging.getLogger(__name__)
+
+# 0 keeps extraction on the event loop; "auto" uses one worker per core
+LINK_EXTRACT_WORKERS = os.getenv("LINK_EXTRACT_WORKERS", "0")
+# Lambda has no /dev/shm, which process pools need for their locks and queues
+ON_LAMBDA = bool(os.getenv("AWS_LAMBDA_FUNCTION_NAME"))
+
+
+def _warm_up():
+    return os.getpid()
+
+
+def _extract_encoded(body, encoding, backend):
+    body = decode_body(body, encoding)
+    return len(body), extract_links(body, backend)
+
+
+class ExtractPool:
+    """Runs link extraction in worker processes so the event loop only does network I/O.
+
+    A page body is read into one bytes object and handed to a worker still
+    compressed; crossing the process boundary costs a single pickle copy of
+    those bytes, and only the much smaller list of links comes back.
+
+    Workers are spawned on first use (or by `warm_up`) and live as long as
+    the process, not the app's lifespan. The pool is for the container
+    deployment only: under Lambda it is turned off and extraction stays on
+    the event loop.
+    """
+
+    def __init__(self, workers=0):
+        if workers == "auto":
+            workers = os.cpu_count() or 1
+        workers = int(workers)
+        if workers and ON_LAMBDA:
+            logger.warning(f"Ignoring {workers} link extraction workers: process pools do not work on Lambda")
+            workers = 0
+        self.workers = workers
+        self._executor = None
+
+    @property
+    def enabled(self):
+        return self.workers > 0
+
+    def _get_executor(self):
+        if self._executor is None:
+            # Forking a process that runs an event loop and resolver threads is unsafe
+            self._executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+            atexit.register(self.close)
+            logger.info(f"Started {self.workers} link extraction processes")
+        return self._executor
+
+    async def warm_up(self):
+        """Starts every worker now rather than on the first page."""
+        if self.enabled:
+            loop = asyncio.get_running_loop()
+            executor = self._get_executor()
+            await asyncio.gather(*(loop.run_in_executor(executor, _warm_up) for _ in range(self.workers)))
+
+    async def extract(self, body, backend=None, encoding=""):
+        """Links in `body`, decoded first if it has a Content-Encoding."""
+        loop = asyncio.get_running_loop()
+        decoded_bytes, links = await loop.run_in_executor(self._get_executor(), _extract_encoded, body, encoding, backend)
+        record(decoded_bytes=decoded_bytes)
+        return links
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+
+extract_pool = ExtractPool(LINK_EXTRACT_WORKERS)
@@ -0,0 +1,175 @@
+from aiohttp import web
+from email.utils import formatdate
+from urllib.parse import quote, unquote
+import time
+import zlib
+import asyncio
+
+# Page size of the real API for non-bot clients when a limit of "max" is requested
+API_PAGE_LIMIT = 500
+
+
+class FakeWikipedia:
+    """Local stand-in for en.wikipedia.org serving a fixed link graph.
+
+    `graph` maps a title to the titles it links to and `redirects` maps alias
+    titles to articles. `navboxes` maps a title to more links, rendered in a
+    navbox at the bottom of its article body; the API lists them like any
+    other link. Article HTML is served under /wiki/<title> and the
+    subset of the Action API the fetch layer uses (prop=links, linkshere and
+    redirects, list=backlinks, redirects=1) under /w/api.php.
+
+    Like Wikipedia, articles carry an ETag and Last-Modified and answer
+    matching conditional requests with 304, and bodies are gzipped for
+    clients that accept it. `not_modified` counts the 304s.
+    """
+
+    def __init__(self, graph, redirects=None, latency=0.0, navboxes=None):
+        self.graph = graph
+        self.navboxes = navboxes or {}
+        # Every link on each page, as the API reports them
+        self.links = {title: links + self.navboxes.get(title, []) for title, links in graph.items()}
+        self.redirects = redirects or {}
+        self.latency = latency
+        self.requests = 0
+        self.not_modified = 0
+        self.last_modified = formatdate(time.time(), usegmt=True)
+        self.backlinks = {title: [] for title in graph}
+        for title, links in self.links.items():
+            for link in links:
+                self.backlinks.setdefault(link, []).append(title)
+        # A redirect page links to its target, so it is one of the target's backlinks
+        for alias, target in self.redirects.items():
+            self.backlinks.setdefault(target, []).append(alias)
+        self._runner = None
+
+    def make_app(self):
+        app = web.Application()
+        app.router.add_get("/wiki/{title:.+}", self.article)
+        app.router.add_get("/w/api.php", self.api)
+        return app
+
+    async def start(self, host="127.0.0.1", port=0):
+        self._runner = web.AppRunner(self.make_app())
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        return f"http://{host}:{port}"
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    async def _delay(self):
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    async def article(self, request):
+        await self._delay()
+        title = unquote(request.match_info["title"]).replace("_", " ")
+        # Like Wikipedia, a redirect title serves its target's content without an HTTP redirect
+        title = self.redirects.get(title, title)
+        if title not in self.graph:
+            raise web.HTTPNotFound()
+        navbox = ""
+        if self.navboxes.get(title):
+            navbox = f'<div role="navigation" class="navbox"><ul>{self._anchors(self.navboxes[title])}</ul></div>'
+        html = (
+            f'<html><head><title>{title} - Wikipedia</title></head><body>'
+            f'<a href="/wiki/Special:Random">Random article</a><a href="/wiki/Help:Contents">Help</a>'
+            f'<div id="mw-content-text"><ul>{self._anchors(self.graph[title])}</ul>{navbox}</div></body></html>'
+        )
+        # Changes whenever the page's links do, like a revision id
+        validators = {"ETag": f'W/"{zlib.crc32(html.encode("utf-8")):08x}"', "Last-Modified": self.last_modified}
+        if request.headers.get("If-None-Match") == validators["ETag"]:
+            self.not_modified += 1
+            return web.Response(status=304, headers=validators)
+        return self._compressed(web.Response(text=html, content_type="text/html", headers=validators))
+
+    @staticmethod
+    def _anchors(links):
+        return "".join(
+            f'<li><a href="/wiki/{quote(link.replace(" ", "_"), safe=";@$!*(),/~:")}" title="{link}">{link}</a></li>'
+            for link in links
+        )
+
+    @staticmethod
+    def _compressed(response):
+        # Picks gzip or deflate from the request's Accept-Encoding, if any
+        response.enable_compression()
+        return response
+
+    async def api(self, request):
+        await self._delay()
+        params = request.query
+        if params.get("list") == "backlinks":
+            return self._compressed(web.json_response(self._backlinks_list(params)))
+        prop = params.get("prop")
+        if prop == "links":
+            return self._compressed(web.json_response(self._prop(params, self.links, "links", "plcontinue")))
+        if prop == "linkshere":
+            return self._compressed(web.json_response(self._prop(params, self.backlinks, "linkshere", "lhcontinue")))
+        if prop == "redirects":
+            aliases = {}
+            for alias, target in self.redirects.items():
+                aliases.setdefault(target, []).append(alias)
+            return self._compressed(web.json_response(self._prop(params, aliases, "redirects", "rdcontinue")))
+        if prop is None and "titles" in params:
+            return self._compressed(web.json_response(self._prop(params, {}, "links", "plcontinue")))
+        return web.json_response({"error": {"code": "badparams", "info": "Unsupported query"}}, status=400)
+
+    def _backlinks_list(self, params):
+        title = params["bltitle"]
+        offset = int(params.get("blcontinue", 0))
+        titles = self.backlinks.get(title, [])
+        page = titles[offset:offset + API_PAGE_LIMIT]
+        entries = []
+        for linker in page:
+            entry = {"ns": 0, "title": linker}
+            if linker in self.redirects:
+                entry["redirect"] = True
+                if params.get("blredirect"):
+                    entry["redirlinks"] = [{"ns": 0, "title": t} for t in self.backlinks.get(linker, [])]
+            entries.append(entry)
+        data = {"query": {"backlinks": entries}}
+        if offset + API_PAGE_LIMIT < len(titles):
+            data["continue"] = {"blcontinue": str(offset + API_PAGE_LIMIT), "continue": "-||"}
+        return data
+
+    def _prop(self, params, adjacency, key, continue_key):
+        requested = params["titles"].split("|")
+        normalized = []
+        resolved = []
+        titles = []
+        for title in requested:
+            canonical = title.replace("_", " ")
+            canonical = canonical[:1].upper() + canonical[1:]
+            if canonical != title:
+                normalized.append({"from": title, "to": canonical})
+            if params.get("redirects") and canonical in self.redirects:
+                resolved.append({"from": canonical, "to": self.redirects[canonical]})
+                canonical = self.redirects[canonical]
+            titles.append(canonical)
+        # Continuation walks the flattened (page, link) pairs like the real API does
+        pairs = [(title, link) for title in titles for link in adjacency.get(title, [])]
+        offset = int(params.get(continue_key, 0))
+        chunk = pairs[offset:offset + API_PAGE_LIMIT]
+        pages = {title: {"ns": 0, "title": title} for title in titles}
+        for title in titles:
+            if title not in self.graph:
+                pages[title]["missing"] = True
+        for title, link in chunk:
+            entry = {"ns": 0, "title": link}
+            if key == "linkshere" and link in self.redirects:
+                entry["redirect"] = True
+            pages[title].setdefault(key, []).append(entry)
+        data = {"batchcomplete": offset + API_PAGE_LIMIT >= len(pairs), "query": {"pages": list(pages.values())}}
+        if normalized:
+            data["query"]["normalized"] = normalized
+        if resolved:
+            data["query"]["redirects"] = resolved
+        if offset + API_PAGE_LIMIT < len(pairs):
+            data["continue"] = {continue_key: str(offset + API_PAGE_LIMIT), "continue": "||"}
+        return data
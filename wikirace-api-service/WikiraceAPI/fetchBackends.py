@@ -0,0 +1,441 @@
+from urllib.parse import urlsplit
+from contextlib import aclosing
+from array import array
+import os
+import json
+import time
+import logging
+import asyncio
+import aiohttp
+from WikiraceAPI.linkCache import link_cache_from_env
+from WikiraceAPI.rateLimiter import rate_limiter_from_env
+from WikiraceAPI.linkExtractor import new_link_extractor, CHUNK_SIZE, WIKI_ORIGIN
+from WikiraceAPI.titles import url_to_title, redirects, title_table
+from WikiraceAPI.extractPool import extract_pool
+from WikiraceAPI.pageStore import page_store_from_env
+from WikiraceAPI.httpPool import ContentDecoder
+from WikiraceAPI.searchMetrics import record, timed
+from WikiraceAPI.fetchScheduler import fetch_scheduler
+
+logger = logging.getLogger(__name__)
+
+# ---------- Global Variables ----------
+headers = {
+    "User-Agent": "FastestWikiRaceBot/1.0 (https://www.alinasworldwideweb.com; alinahgarib@gmail.com)"
+}
+# Concurrency is bounded by the request budget rather than a fixed semaphore
+rate_limiter = rate_limiter_from_env()
+THROTTLE_STATUSES = (429, 503)
+MAX_RETRIES = 3
+# A page that fails with one of these is logged and treated as having no links; a body read can time out too
+FETCH_ERRORS = (aiohttp.ClientError, asyncio.TimeoutError, ValueError)
+WIKI_API_URL = WIKI_ORIGIN + "/w/api.php"
+WIKI_HOSTS = {urlsplit(WIKI_ORIGIN).hostname, "en.wikipedia.org", "en.m.wikipedia.org"}
+# Hub articles have millions of backlinks; the backward frontier only needs a sample
+MAX_BACKLINKS = 5000
+# The Action API accepts up to 50 titles per query
+API_BATCH_SIZE = 50
+# Per title: a hub can take all of a batch's calls before the other titles are listed
+MAX_BACKLINK_API_CALLS = 10
+DEFAULT_BACKEND = os.getenv("FETCH_BACKEND", "api")
+# Shared by every request in the process, keyed on the page title rather than the session
+link_cache = link_cache_from_env("LINK_CACHE")
+backlink_cache = link_cache_from_env("BACKLINK_CACHE")
+# Validators and links of fetched articles, for conditional refetches once the link cache's copy expires
+page_store = page_store_from_env()
+
+
+class BacklinkSample(array):
+    """Backlinks of a page whose listing was cut short: usable as a sample, never cached.
+
+    A search that expands one can no longer promise a shortest path.
+    """
+
+
+# ---------- Helper Functions ----------
+async def read_json(response):
+    body = await response.read()
+    record(bytes=len(body))
+    with timed("parse_seconds"):
+        body = ContentDecoder(response.headers.get("Content-Encoding", "")).decompress(body)
+        record(decoded_bytes=len(body))
+        return json.loads(body)
+
+async def read_links(response):
+    encoding = response.headers.get("Content-Encoding", "")
+    if extract_pool.enabled:
+        body = await response.read()
+        record(bytes=len(body))
+        # The loop only downloads; decoding and parsing run on another core
+        with timed("parse_seconds"):
+            return await extract_pool.extract(body, encoding=encoding)
+    # Links are extracted chunk by chunk while the rest of the body is still downloading
+    decoder = ContentDecoder(encoding)
+    extractor = new_link_extractor()
+    async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+        record(bytes=len(chunk))
+        with timed("parse_seconds"):
+            chunk = decoder.decompress(chunk)
+            record(decoded_bytes=len(chunk))
+            extractor.feed(chunk)
+    with timed("parse_seconds"):
+        extractor.feed(decoder.flush())
+        return extractor.close()
+
+async def read_page(response):
+    """(ETag, Last-Modified, links) of an article response."""
+    return response.headers.get("ETag"), response.headers.get("Last-Modified"), await read_links(response)
+
+async def fetch(url, session, params=None, read=read_json, validators=None):
+    """GET through the rate limiter, backing off and retrying when throttled.
+
+    With `validators` (conditional request headers), returns None on 304 Not Modified.
+    """
+    request_headers = {**headers, **validators} if validators else headers
+    for attempt in range(MAX_RETRIES + 1):
+        with timed("rate_limit_seconds"):
+            await rate_limiter.acquire(url)
+        record(fetches=1)
+        with timed("request_seconds"):
+            async with session.get(url, params=params, headers=request_headers) as response:
+                if response.status in THROTTLE_STATUSES:
+                    record(throttled=1)
+                    rate_limiter.throttle(url, response.headers.get("Retry-After"))
+                    continue
+                if response.status == 304 and validators:
+                    record(not_modified=1)
+                    return None
+                response.raise_for_status()
+                return await read(response)
+    raise aiohttp.ClientError(f"Still throttled after {MAX_RETRIES} retries: {url}")
+
+async def get_wikipedia_links(url, session):
+    """Ids of the articles `url` links to, as array('i')."""
+    if urlsplit(url).hostname not in WIKI_HOSTS:
+        return array("i")
+    cached = link_cache.get(url_to_title(url))
+    if cached is not None:
+        return cached
+    return await fetch_wikipedia_links(url, session)
+
+async def fetch_wikipedia_links(url, session):
+    """get_wikipedia_links without the cache lookup, for callers that already missed it; caches the result."""
+    title = url_to_title(url)
+    start_time = time.time()
+    logging.debug(f"Fetching: {url}")
+    stored = page_store.get(title)
+    try:
+        page = await fetch(url, session, read=read_page, validators=page_store.validators(stored))
+    except FETCH_ERRORS as e:
+        logger.error(f"Error fetching URL: {e}")
+        return array("i")
+    if stored is not None:
+        page_store.revalidated(not_modified=page is None)
+    if page is None:
+        links = stored.links
+    else:
+        etag, last_modified, links = page
+        links = redirects.canonical_ids(links)
+        page_store.set(title, etag, last_modified, links)
+
+    elapsed = time.time() - start_time
+    logging.debug(f"Fetched {url} in {elapsed:.2f}s")
+    link_cache.set(title, links)
+    return links
+
+async def get_wikipedia_backlinks(url, session):
+    """Pages that link to `url` ("What links here"), via the MediaWiki API."""
+    cached = backlink_cache.get(url_to_title(url))
+    if cached is not None:
+        return cached
+    return await fetch_wikipedia_backlinks(url, session)
+
+async def fetch_wikipedia_backlinks(url, session):
+    """get_wikipedia_backlinks without the cache lookup; caches complete results."""
+    title = url_to_title(url)
+    params = {
+        "action": "query",
+        "format": "json",
+        "list": "backlinks",
+        "bltitle": title,
+        "blnamespace": "0",
+        # Also list pages that only link here through a redirect
+        "blredirect": "1",
+        "bllimit": "max",
+    }
+    backlinks = []
+    complete = False
+    logging.debug(f"Fetching backlinks: {url}")
+    try:
+        while len(backlinks) < MAX_BACKLINKS:
+            data = await fetch(WIKI_API_URL, session, params=params)
+            for page in data.get("query", {}).get("backlinks", []):
+                if page.get("redirect"):
+                    redirects.learn(page["title"], title)
+                    backlinks.extend(linker["title"] for linker in page.get("redirlinks", []))
+                else:
+                    backlinks.append(page["title"])
+            if "continue" not in data:
+                complete = len(backlinks) <= MAX_BACKLINKS
+                break
+            params.update(data["continue"])
+    except FETCH_ERRORS as e:
+        logger.error(f"Error fetching backlinks: {e}")
+    backlinks = redirects.canonical_ids(backlinks[:MAX_BACKLINKS])
+    if not complete:
+        return BacklinkSample("i", backlinks)
+    backlink_cache.set(title, backlinks)
+    return backlinks
+
+async def resolve_redirects(titles, session):
+    """Canonical titles for `titles`, resolving unknown ones 50 at a time via the API."""
+    unknown = [title for title in dict.fromkeys(titles) if not redirects.knows(title)]
+    for i in range(0, len(unknown), API_BATCH_SIZE):
+        params = {
+            "action": "query",
+            "format": "json",
+            "formatversion": "2",
+            "redirects": "1",
+            "titles": "|".join(unknown[i:i + API_BATCH_SIZE]),
+        }
+        try:
+            data = await fetch(WIKI_API_URL, session, params=params)
+        except FETCH_ERRORS as e:
+            logger.error(f"Error resolving redirects: {e}")
+            break
+        for alias in data.get("query", {}).get("redirects", []):
+            redirects.learn(alias["from"], alias["to"])
+        redirects.mark_checked(title_table.intern(title) for title in unknown[i:i + API_BATCH_SIZE])
+    return [redirects.resolve(title) for title in titles]
+
+async def get_redirect_aliases(title, session):
+    """Learns every redirect that points at `title`, so links through them match it."""
+    params = {
+        "action": "query",
+        "format": "json",
+        "formatversion": "2",
+        "prop": "redirects",
+        "rdnamespace": "0",
+        "rdlimit": "max",
+        "titles": title,
+    }
+    aliases = []
+    try:
+        for _ in range(MAX_BACKLINK_API_CALLS):
+            data = await fetch(WIKI_API_URL, session, params=params)
+            for page in data.get("query", {}).get("pages", []):
+                aliases.extend(alias["title"] for alias in page.get("redirects", []))
+            if "continue" not in data:
+                break
+            params.update(data["continue"])
+    except FETCH_ERRORS as e:
+        logger.error(f"Error fetching redirects to {title}: {e}")
+    for alias in aliases:
+        redirects.learn(alias, title)
+    return aliases
+
+# ---------- Fetch Backends ----------
+class FetchBackend:
+    """Yields `(page_id, links)` pairs for a frontier as soon as each result is ready.
+
+    Pages are interned title ids and `links` is an array('i') of them.
+    Subclasses implement `_fetch_links` / `_fetch_backlinks`, which take a
+    list of uncached page ids and return a dict of page_id -> links; the
+    fetch scheduler calls them for `batch_size` pages at a time.
+
+    Links are folded through `redirects` as they are yielded, cached lists
+    included, so redirects learned after a list was cached still apply. A
+    frontier page that is an alias shares its article's links and fetch.
+    """
+
+    name = None
+    batch_size = 1
+    # Whether frontier titles need resolving before they are fetched; the API does it in the same query
+    resolves_redirects_first = False
+
+    def iter_links(self, page_ids, session):
+        return self._iter("links", page_ids, session, link_cache, self._fetch_links)
+
+    def iter_backlinks(self, page_ids, session):
+        return self._iter("backlinks", page_ids, session, backlink_cache, self._fetch_backlinks)
+
+    async def _iter(self, kind, page_ids, session, cache, fetch_batch):
+        if self.resolves_redirects_first:
+            unchecked = redirects.unchecked(page_ids)
+            if unchecked:
+                await resolve_redirects([title_table.title(page_id) for page_id in unchecked], session)
+        # Article id -> the frontier ids it stands for, the article itself first
+        wanted = {}
+        for page_id in page_ids:
+            article = redirects.resolve_id(page_id)
+            asked = wanted.setdefault(article, [])
+            if page_id == article:
+                asked.insert(0, page_id)
+            else:
+                asked.append(page_id)
+        pending = array("i")
+        for article, asked in wanted.items():
+            cached = cache.get(title_table.title(article))
+            if cached is not None:
+                record(cache_hits=1, pages_expanded=1, links_found=len(cached))
+                cached = self._fold(cached)
+                for page_id in asked:
+                    yield page_id, cached
+            else:
+                record(cache_misses=1)
+                pending.append(article)
+        # Runs until the search stops early too: closing it cancels fetches still in flight
+        async with aclosing(fetch_scheduler.run(kind, pending, self.batch_size, fetch_batch, session)) as results:
+            async for article, links in results:
+                record(pages_expanded=1, links_found=len(links))
+                if isinstance(links, BacklinkSample):
+                    record(sampled_backlinks=1)
+                links = self._fold(links)
+                for page_id in wanted.get(article, (article,)):
+                    yield page_id, links
+
+    @staticmethod
+    def _fold(links):
+        folded = redirects.fold(links)
+        if folded is not links and isinstance(links, BacklinkSample):
+            return BacklinkSample("i", folded)
+        return folded
+
+
+class HtmlFetchBackend(FetchBackend):
+    """Scrapes rendered article HTML, one request per page."""
+
+    name = "html"
+    resolves_redirects_first = True
+
+    async def _fetch_links(self, page_ids, session):
+        return {page_ids[0]: await fetch_wikipedia_links(title_table.url(page_ids[0]), session)}
+
+    async def _fetch_backlinks(self, page_ids, session):
+        return {page_ids[0]: await fetch_wikipedia_backlinks(title_table.url(page_ids[0]), session)}
+
+
+class ApiFetchBackend(FetchBackend):
+    """MediaWiki Action API: prop=links / prop=linkshere for 50 titles per call.
+
+    A batch that fails falls back to the HTML backend page by page.
+    """
+
+    name = "api"
+    batch_size = API_BATCH_SIZE
+
+    async def _query(self, page_ids, session, params, result_key, max_calls=None):
+        """Runs one multi-title query with continuation.
+
+        Returns (page_id -> raw result entries, ids whose entries may be
+        incomplete). Continuation lists the titles one after another, so when
+        `max_calls` stops it early, titles listed in the last response or not
+        yet at all may be cut short; the others are complete.
+        """
+        # A title may stand for several ids once an alias and its article are in the same batch
+        requested = {}
+        for page_id in page_ids:
+            requested.setdefault(title_table.title(page_id), []).append(page_id)
+        params = dict(params, action="query", format="json", formatversion="2", titles="|".join(requested))
+        results = {page_id: [] for page_id in page_ids}
+        listed = set()
+        calls = 0
+        while True:
+            data = await fetch(WIKI_API_URL, session, params=params)
+            calls += 1
+            query = data.get("query", {})
+            for alias in query.get("normalized", []) + query.get("redirects", []):
+                if alias["from"] in requested:
+                    requested.setdefault(alias["to"], []).extend(requested.pop(alias["from"]))
+            for alias in query.get("redirects", []):
+                redirects.learn(alias["from"], alias["to"])
+            if calls == 1 and params.get("redirects"):
+                redirects.mark_checked(page_ids)
+            listed_now = set()
+            for page in query.get("pages", []):
+                for page_id in requested.get(page["title"], ()) if page.get(result_key) else ():
+                    results[page_id].extend(page[result_key])
+                    listed_now.add(page_id)
+            listed |= listed_now
+            if "continue" not in data:
+                return results, set()
+            if max_calls and calls >= max_calls:
+                return results, (set(page_ids) - listed) | listed_now
+            params.update(data["continue"])
+
+    async def _query_per_title(self, page_ids, session, params, result_key):
+        """_query with MAX_BACKLINK_API_CALLS per title rather than per batch.
+
+        Titles a batch may have cut short are queried again on their own.
+        Returns (page_id -> raw result entries, ids still cut short).
+        """
+        results, truncated = await self._query(page_ids, session, params, result_key, max_calls=MAX_BACKLINK_API_CALLS)
+        if len(page_ids) > 1 and truncated:
+            alone = await asyncio.gather(*(
+                self._query([page_id], session, params, result_key, max_calls=MAX_BACKLINK_API_CALLS) for page_id in truncated
+            ))
+            truncated = set()
+            for single, cut_short in alone:
+                results.update(single)
+                truncated |= cut_short
+        return results, truncated
+
+    async def _fetch_links(self, page_ids, session):
+        try:
+            # redirects=1 folds frontier titles that are themselves redirects onto their article
+            raw, _ = await self._query(page_ids, session, {"prop": "links", "plnamespace": "0", "pllimit": "max", "redirects": "1"}, "links")
+        except FETCH_ERRORS as e:
+            logger.error(f"API links batch failed, falling back to HTML: {e}")
+            return await self._fall_back(page_ids, session, fetch_wikipedia_links)
+        results = {page_id: redirects.canonical_ids(link["title"] for link in links) for page_id, links in raw.items()}
+        for page_id, links in results.items():
+            link_cache.set(title_table.title(page_id), links)
+        return results
+
+    async def _fetch_backlinks(self, page_ids, session):
+        params = {"prop": "linkshere", "lhnamespace": "0", "lhprop": "title|redirect", "lhlimit": "max"}
+        try:
+            raw, truncated = await self._query_per_title(page_ids, session, params, "linkshere")
+            # Redirect pages show up as linkers; what links to them links here too
+            via_alias = {}
+            for page_id, linkers in raw.items():
+                for linker in linkers:
+                    if linker.get("redirect"):
+                        redirects.learn(linker["title"], title_table.title(page_id))
+                        via_alias[title_table.intern(linker["title"])] = page_id
+            aliases = list(via_alias)
+            for i in range(0, len(aliases), API_BATCH_SIZE):
+                batch, cut_short = await self._query_per_title(aliases[i:i + API_BATCH_SIZE], session, params, "linkshere")
+                for alias_id, linkers in batch.items():
+                    raw[via_alias[alias_id]].extend(linkers)
+                truncated.update(via_alias[alias_id] for alias_id in cut_short)
+        except FETCH_ERRORS as e:
+            logger.error(f"API linkshere batch failed, falling back to list=backlinks: {e}")
+            return await self._fall_back(page_ids, session, fetch_wikipedia_backlinks)
+        results = {}
+        for page_id, linkers in raw.items():
+            links = redirects.canonical_ids(linker["title"] for linker in linkers if not linker.get("redirect"))
+            if page_id in truncated:
+                results[page_id] = BacklinkSample("i", links)
+            else:
+                results[page_id] = links
+                backlink_cache.set(title_table.title(page_id), links)
+        return results
+
+    @staticmethod
+    async def _fall_back(page_ids, session, fetch_one):
+        results = await asyncio.gather(*(fetch_one(title_table.url(page_id), session) for page_id in page_ids))
+        return dict(zip(page_ids, results))
+
+
+FETCH_BACKENDS = {
+    "html": HtmlFetchBackend,
+    "api": ApiFetchBackend,
+}
+
+
+def get_fetch_backend(backend=None):
+    """Accepts a backend name, or an already-built FetchBackend (e.g. a benchmark stub)."""
+    if isinstance(backend, FetchBackend):
+        return backend
+    return FETCH_BACKENDS[backend or DEFAULT_BACKEND]()
@@ -0,0 +1,115 @@
+import os
+import asyncio
+import logging
+from WikiraceAPI.searchMetrics import record
+
+logger = logging.getLogger(__name__)
+
+# ---------- Global Variables ----------
+# Batches of a frontier fetched at once; the rate limiter still sets the pace
+FETCH_WORKERS = int(os.getenv("FETCH_WORKERS", "32"))
+# Results fetched but not yet consumed by the search before workers pause
+FETCH_RESULT_BUFFER = int(os.getenv("FETCH_RESULT_BUFFER", "64"))
+_DONE = object()
+
+
+class FetchScheduler:
+    """Fetches a frontier with a fixed number of workers instead of one task per page.
+
+    Workers take batches in frontier order, which is priority order for
+    guided search, and put results on a bounded queue. When the search
+    falls behind, they wait, so memory does not grow with the frontier.
+
+    Fetches are single-flight across every search in the process: a page
+    already being fetched is waited for, not requested again. If that
+    fetch is abandoned (its search was cancelled), the waiter fetches the
+    page itself.
+    """
+
+    def __init__(self, workers=FETCH_WORKERS, buffer=FETCH_RESULT_BUFFER):
+        self.workers = workers
+        self.buffer = buffer
+        self.merged = 0
+        # (kind, page_id) -> future resolved with the links, or None if the fetch was abandoned
+        self._in_flight = {}
+
+    async def run(self, kind, page_ids, batch_size, fetch_batch, session):
+        """Yields `(page_id, links)` for `page_ids` as batches complete.
+
+        `fetch_batch(batch, session)` returns a dict of page_id -> links.
+        Closing the generator early cancels the outstanding fetches.
+        """
+        starts = range(0, len(page_ids), batch_size)
+        if not starts:
+            return
+        # Shared by the workers: each takes the next batch when it is free
+        batches = (page_ids[i:i + batch_size] for i in starts)
+        results = asyncio.Queue(self.buffer)
+
+        async def work():
+            for batch in batches:
+                for item in (await self._fetch(kind, batch, fetch_batch, session)).items():
+                    await results.put(item)
+
+        async def finish(workers):
+            try:
+                await asyncio.gather(*workers)
+            except Exception as e:
+                await results.put(e)
+            else:
+                await results.put(_DONE)
+
+        workers = [asyncio.create_task(work()) for _ in range(min(self.workers, len(starts)))]
+        finisher = asyncio.create_task(finish(workers))
+        try:
+            while (item := await results.get()) is not _DONE:
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            for task in workers + [finisher]:
+                task.cancel()
+            await asyncio.gather(*workers, finisher, return_exceptions=True)
+
+    async def _fetch(self, kind, batch, fetch_batch, session):
+        loop = asyncio.get_running_loop()
+        waiting = {}
+        owned = {}
+        for page_id in batch:
+            future = self._in_flight.get((kind, page_id))
+            if future is not None:
+                waiting[page_id] = future
+            else:
+                owned[page_id] = self._in_flight[kind, page_id] = loop.create_future()
+        results = {}
+        try:
+            if owned:
+                results = await fetch_batch(list(owned), session)
+        finally:
+            for page_id, future in owned.items():
+                del self._in_flight[kind, page_id]
+                future.set_result(results.get(page_id))
+        if waiting:
+            self.merged += len(waiting)
+            record(merged_fetches=len(waiting))
+            # Shielded: a waiter giving up must not cancel the fetch for everyone else
+            shared = await asyncio.gather(*(asyncio.shield(future) for future in waiting.values()))
+            abandoned = []
+            for page_id, links in zip(waiting, shared):
+                if links is None:
+                    abandoned.append(page_id)
+                else:
+                    results[page_id] = links
+            if abandoned:
+                results.update(await fetch_batch(abandoned, session))
+        return results
+
+    def stats(self):
+        return {
+            "workers": self.workers,
+            "in_flight": len(self._in_flight),
+            "merged": self.merged,
+        }
+
+
+fetch_scheduler = FetchScheduler()
@@ -0,0 +1,285 @@
+from array import array
+import os
+import mmap
+import tempfile
+import logging
+from WikiraceAPI.titles import EMPTY_SLOT
+from WikiraceAPI.searchMetrics import record
+
+logger = logging.getLogger(__name__)
+
+# ---------- Global Variables ----------
+# Where spilled frontiers and parent pointers go; files are unlinked as soon as they are created
+SPILL_DIR = os.getenv("SEARCH_SPILL_DIR", tempfile.gettempdir())
+# Default in-memory budget of one search's frontiers and parent pointers, a few million pages
+SEARCH_FRONTIER_BUDGET_MB = int(os.getenv("SEARCH_FRONTIER_BUDGET_MB", "32"))
+# Frontier appends between budget checks, and ids buffered before a write once spilled
+CHECK_EVERY = 4096
+ITEM_SIZE = array("i").itemsize
+# Parent pointer markers: the page a search started from, and pages it has not reached
+ROOT = -1
+UNSEEN = -2
+
+
+def _spill_file():
+    return tempfile.TemporaryFile(prefix="wikirace-search-", dir=SPILL_DIR)
+
+
+class ParentPointers:
+    """The page each reached page was first reached from, by interned page id.
+
+    An open-addressing table of (page id, parent) in two array('i'), kept
+    at most half full: about 16 bytes per page this search reached, however
+    many titles the process has interned.
+    """
+
+    def __init__(self, root):
+        self._keys = array("i", [EMPTY_SLOT]) * 16
+        self._parents = array("i", [UNSEEN]) * 16
+        self._shift = 32 - 4
+        self._length = 0
+        self._probed = EMPTY_SLOT, 0
+        self[root] = ROOT
+
+    def _slot(self, page_id):
+        """The slot holding `page_id`, or the empty slot it would go in; Fibonacci hashing, linear probing."""
+        keys = self._keys
+        mask = len(keys) - 1
+        slot = (page_id * 0x9E3779B1 & 0xFFFFFFFF) >> self._shift
+        key = keys[slot]
+        while key != page_id and key != EMPTY_SLOT:
+            slot = (slot + 1) & mask
+            key = keys[slot]
+        # Searches test membership before adding, so __setitem__ can reuse the probe
+        self._probed = page_id, slot
+        return slot
+
+    def __contains__(self, page_id):
+        return self._keys[self._slot(page_id)] == page_id
+
+    def __getitem__(self, page_id):
+        slot = self._slot(page_id)
+        if self._keys[slot] != page_id:
+            raise KeyError(page_id)
+        return self._parents[slot]
+
+    def __setitem__(self, page_id, parent):
+        probed_id, slot = self._probed
+        if probed_id != page_id:
+            slot = self._slot(page_id)
+        if self._keys[slot] != page_id:
+            self._keys[slot] = page_id
+            self._length += 1
+        self._parents[slot] = parent
+        self.last = page_id
+        if 2 * self._length > len(self._keys):
+            self._grow()
+
+    def _grow(self):
+        keys, parents = self._keys, self._parents
+        self._keys = array("i", [EMPTY_SLOT]) * (2 * len(keys))
+        self._parents = array("i", [UNSEEN]) * (2 * len(keys))
+        self._shift -= 1
+        self._probed = EMPTY_SLOT, 0
+        for page_id, parent in zip(keys, parents):
+            if page_id != EMPTY_SLOT:
+                slot = self._slot(page_id)
+                self._keys[slot] = page_id
+                self._parents[slot] = parent
+
+    def items(self):
+        return ((page_id, parent) for page_id, parent in zip(self._keys, self._parents) if page_id != EMPTY_SLOT)
+
+    def __len__(self):
+        return self._length
+
+    def memory_bytes(self):
+        return 2 * len(self._keys) * ITEM_SIZE
+
+
+class FrontierStore:
+    """Frontiers and parent pointers of one search, kept within a memory budget.
+
+    While their arrays add up to less than `budget_mb`, everything stays in
+    memory. Past it, the largest array moves to a file under SPILL_DIR and
+    is read back through mmap, so the kernel can drop its pages under
+    memory pressure instead of the container being killed.
+
+    The budget covers this search's own state only. Titles it interns go to
+    the process-wide title table (see TITLE_TABLE_MAX_ENTRIES) and fetched
+    link lists to the link caches, which have bounds of their own.
+    """
+
+    def __init__(self, budget_mb=None):
+        self.budget_bytes = (budget_mb or SEARCH_FRONTIER_BUDGET_MB) * 1024 * 1024
+        self.spilled_bytes = 0
+        self._structures = []
+
+    @classmethod
+    def in_memory(cls):
+        """A store without a budget, that never spills."""
+        store = cls()
+        store.budget_bytes = float("inf")
+        return store
+
+    def frontier(self, page_ids=()):
+        return self._register(SpillableFrontier(self, page_ids))
+
+    def parents(self, root):
+        return self._register(SpillableParents(self, root))
+
+    def _register(self, structure):
+        self._structures.append(structure)
+        self.check()
+        return structure
+
+    def release(self, structure):
+        self._structures.remove(structure)
+        structure.close()
+
+    def memory_bytes(self):
+        return sum(structure.memory_bytes() for structure in self._structures)
+
+    def check(self):
+        """Spills the largest in-memory arrays until the rest fit the budget."""
+        while self.memory_bytes() > self.budget_bytes:
+            largest = max(self._structures, key=lambda structure: structure.memory_bytes())
+            size = largest.memory_bytes()
+            largest.spill()
+            self.spilled_bytes += size
+            record(spilled_bytes=size)
+            logger.info(f"Spilled {size / 1024 / 1024:.1f}MB of search state to {SPILL_DIR}")
+
+    def close(self):
+        for structure in self._structures:
+            structure.close()
+        self._structures.clear()
+
+
+class SpillableFrontier:
+    """An append-only array('i') of page ids that can move to disk, read back in chunks."""
+
+    def __init__(self, store, page_ids=()):
+        self._store = store
+        self._ids = array("i", page_ids)
+        self._file = None
+        self._length = len(self._ids)
+
+    def __len__(self):
+        return self._length
+
+    def append(self, page_id):
+        self._ids.append(page_id)
+        self._length += 1
+        if len(self._ids) % CHECK_EVERY == 0:
+            if self._file is None:
+                self._store.check()
+            else:
+                self._flush()
+
+    def memory_bytes(self):
+        return 0 if self._file is not None else len(self._ids) * ITEM_SIZE
+
+    def spill(self):
+        self._file = _spill_file()
+        self._flush()
+
+    def _flush(self):
+        self._file.write(self._ids.tobytes())
+        self._ids = array("i")
+
+    def chunks(self, size):
+        """Yields the ids in order: all at once while in memory, else read back as array('i') chunks of at most `size`."""
+        if self._file is None:
+            if self._ids:
+                yield self._ids
+            return
+        self._flush()
+        self._file.flush()
+        if not self._length:
+            return
+        with mmap.mmap(self._file.fileno(), self._length * ITEM_SIZE, access=mmap.ACCESS_READ) as mapped:
+            for offset in range(0, self._length * ITEM_SIZE, size * ITEM_SIZE):
+                chunk = array("i")
+                chunk.frombytes(mapped[offset:offset + size * ITEM_SIZE])
+                yield chunk
+
+    def close(self):
+        self._ids = array("i")
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class SpillableParents:
+    """ParentPointers that can move to a memory-mapped file.
+
+    In memory they are a ParentPointers table. Spilled, the file is indexed
+    by page id directly, holding the parent plus 2 so that 0, what a newly
+    grown, sparse region of the file reads as, means not reached yet.
+    """
+
+    def __init__(self, store, root):
+        self._store = store
+        self._file = None
+        self._mapped = None
+        self._table = ParentPointers(root)
+        # An "i" view of the mapped file once spilled
+        self._values = None
+        self.last = root
+
+    def __contains__(self, page_id):
+        if self._file is None:
+            return page_id in self._table
+        values = self._values
+        return page_id < len(values) and values[page_id] != 0
+
+    def __getitem__(self, page_id):
+        if self._file is None:
+            return self._table[page_id]
+        return self._values[page_id] - 2
+
+    def __setitem__(self, page_id, parent):
+        self.last = page_id
+        if self._file is None:
+            size = self._table.memory_bytes()
+            self._table[page_id] = parent
+            if self._table.memory_bytes() != size:
+                self._store.check()
+            return
+        if page_id >= len(self._values):
+            # Extending the file leaves a sparse, zero-filled tail, so it grows
+            # in large steps: remapping for every new title would dominate
+            self._resize(max(page_id + 1, len(self._values) * 2))
+        self._values[page_id] = parent + 2
+
+    def _resize(self, size):
+        self._unmap()
+        os.ftruncate(self._file.fileno(), size * ITEM_SIZE)
+        self._mapped = mmap.mmap(self._file.fileno(), size * ITEM_SIZE)
+        self._values = memoryview(self._mapped).cast("i")
+
+    def _unmap(self):
+        if self._mapped is not None:
+            self._values.release()
+            self._mapped.close()
+            self._mapped = None
+        self._values = None
+
+    def memory_bytes(self):
+        return 0 if self._file is not None else self._table.memory_bytes()
+
+    def spill(self):
+        entries = list(self._table.items())
+        self._file = _spill_file()
+        self._resize(max(page_id for page_id, _ in entries) + 1)
+        for page_id, parent in entries:
+            self._values[page_id] = parent + 2
+        self._table = None
+
+    def close(self):
+        self._unmap()
+        self._table = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
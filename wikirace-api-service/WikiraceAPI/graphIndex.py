@@ -0,0 +1,163 @@
+import os
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+# ---------- File Layout ----------
+# <index dir>/
+#   meta.json              node and edge counts
+#   offsets.npy            CSR row offsets, int32 (int64 once edges overflow int32)
+#   targets.npy            CSR column ids, int32
+#   in_offsets.npy         reverse CSR ("what links here") offsets
+#   in_targets.npy         reverse CSR source ids
+#   titles.bin             UTF-8 titles concatenated in id order
+#   title_offsets.npy      byte offset of each title in titles.bin, int64
+#   title_order.npy        ids sorted by title bytes, for binary-search lookups
+#   aliases.bin            UTF-8 redirect titles concatenated, sorted by their bytes
+#   alias_offsets.npy      byte offset of each redirect title in aliases.bin, int64
+#   alias_targets.npy      id of the article each redirect leads to, int32
+# Every array is loaded with mmap_mode="r", so opening an index costs page faults, not reads.
+# NumPy is imported on first use: the API imports this module whether or not an index is configured.
+INDEX_FILES = ("offsets", "targets", "in_offsets", "in_targets", "title_offsets", "title_order")
+ALIAS_FILES = ("alias_offsets", "alias_targets")
+OFFLINE_MAX_DEPTH = 50
+
+
+def _offsets_dtype(edge_count):
+    import numpy as np
+    return np.int32 if edge_count < np.iinfo(np.int32).max else np.int64
+
+
+def _csr(sources, targets, node_count):
+    import numpy as np
+    order = np.argsort(sources, kind="stable")
+    counts = np.bincount(sources, minlength=node_count)
+    offsets = np.zeros(node_count + 1, dtype=_offsets_dtype(len(targets)))
+    np.cumsum(counts, out=offsets[1:])
+    return offsets, targets[order].astype(np.int32)
+
+
+def write_graph_index(path, titles, sources, targets, aliases=None):
+    """Writes a CSR index for edges sources[i] -> targets[i] between title ids.
+
+    `aliases` maps redirect titles to the id of the article they lead to.
+    """
+    import numpy as np
+    os.makedirs(path, exist_ok=True)
+    sources = np.asarray(sources, dtype=np.int64)
+    targets = np.asarray(targets, dtype=np.int64)
+    # Self links and duplicate edges only slow the search down
+    keep = sources != targets
+    edges = np.unique(sources[keep] * len(titles) + targets[keep])
+    sources, targets = np.divmod(edges, len(titles))
+
+    offsets, out_targets = _csr(sources, targets, len(titles))
+    in_offsets, in_targets = _csr(targets, sources, len(titles))
+    encoded = [title.encode("utf-8") for title in titles]
+    title_offsets = np.zeros(len(titles) + 1, dtype=np.int64)
+    np.cumsum([len(title) for title in encoded], out=title_offsets[1:])
+    title_order = np.array(sorted(range(len(encoded)), key=encoded.__getitem__), dtype=np.int32)
+    alias_items = sorted((alias.encode("utf-8"), target) for alias, target in (aliases or {}).items())
+    alias_offsets = np.zeros(len(alias_items) + 1, dtype=np.int64)
+    np.cumsum([len(alias) for alias, _ in alias_items], out=alias_offsets[1:])
+
+    arrays = {
+        "offsets": offsets,
+        "targets": out_targets,
+        "in_offsets": in_offsets,
+        "in_targets": in_targets,
+        "title_offsets": title_offsets,
+        "title_order": title_order,
+        "alias_offsets": alias_offsets,
+        "alias_targets": np.array([target for _, target in alias_items], dtype=np.int32),
+    }
+    for name, array in arrays.items():
+        np.save(os.path.join(path, f"{name}.npy"), array)
+    with open(os.path.join(path, "titles.bin"), "wb") as f:
+        for title in encoded:
+            f.write(title)
+    with open(os.path.join(path, "aliases.bin"), "wb") as f:
+        for alias, _ in alias_items:
+            f.write(alias)
+    with open(os.path.join(path, "meta.json"), "w") as f:
+        json.dump({"nodes": len(titles), "edges": int(len(out_targets)), "aliases": len(alias_items)}, f)
+    logger.info(f"Wrote graph index with {len(titles)} pages, {len(out_targets)} links and {len(alias_items)} redirects to {path}")
+
+
+class GraphIndex:
+    """Read-only, memory-mapped link graph built by buildGraphIndex."""
+
+    def __init__(self, path):
+        import numpy as np
+        self.path = path
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        self.node_count = meta["nodes"]
+        self.edge_count = meta["edges"]
+        # Indexes built before redirects were kept have none
+        self.alias_count = meta.get("aliases", 0)
+        for name in INDEX_FILES + (ALIAS_FILES if self.alias_count else ()):
+            setattr(self, name, np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r"))
+        self.titles = self._blob("titles.bin", self.title_offsets[-1])
+        self.aliases = self._blob("aliases.bin", self.alias_offsets[-1]) if self.alias_count else b""
+
+    def _blob(self, name, size):
+        import numpy as np
+        return np.memmap(os.path.join(self.path, name), dtype=np.uint8, mode="r") if size else b""
+
+    def title(self, page_id):
+        start, end = self.title_offsets[page_id], self.title_offsets[page_id + 1]
+        return bytes(self.titles[start:end]).decode("utf-8")
+
+    def lookup(self, title):
+        """Returns the id of `title`, or of the article it redirects to; None when neither is in the index."""
+        wanted = title.encode("utf-8")
+        position = _bisect(self.titles, self.title_offsets, self.node_count, wanted, self.title_order)
+        if position is not None:
+            return int(self.title_order[position])
+        if self.alias_count:
+            position = _bisect(self.aliases, self.alias_offsets, self.alias_count, wanted)
+            if position is not None:
+                return int(self.alias_targets[position])
+        return None
+
+    def links(self, page_id):
+        return self.targets[self.offsets[page_id]:self.offsets[page_id + 1]]
+
+    def backlinks(self, page_id):
+        return self.in_targets[self.in_offsets[page_id]:self.in_offsets[page_id + 1]]
+
+    def find_path(self, start_id, end_id, max_depth=OFFLINE_MAX_DEPTH):
+        """Shortest path of page ids; [] when unreachable, None past max_depth."""
+        from WikiraceAPI.graphSearch import bidirectional_path
+        return bidirectional_path(self.offsets, self.targets, self.in_offsets, self.in_targets, start_id, end_id, max_depth)
+
+
+def _bisect(blob, offsets, count, wanted, order=None):
+    """Position of `wanted` among `count` strings of `blob` sorted by bytes (through `order`), or None."""
+    def at(position):
+        string_id = int(order[position]) if order is not None else position
+        return bytes(blob[offsets[string_id]:offsets[string_id + 1]])
+
+    low, high = 0, count
+    while low < high:
+        middle = (low + high) // 2
+        if at(middle) < wanted:
+            low = middle + 1
+        else:
+            high = middle
+    return low if low < count and at(low) == wanted else None
+
+
+_graph_index = None
+
+
+def get_graph_index():
+    """The index at GRAPH_INDEX_PATH, opened once per process; None if unset."""
+    global _graph_index
+    path = os.getenv("GRAPH_INDEX_PATH")
+    if _graph_index is None and path:
+        _graph_index = GraphIndex(path)
+        logger.info(f"Loaded graph index with {_graph_index.node_count} pages from {path}")
+    return _graph_index
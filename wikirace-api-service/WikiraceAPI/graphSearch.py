@@ -0,0 +1,119 @@
+"""Level-synchronous BFS over a CSR graph using NumPy arrays of page ids.
+
+A level is expanded with a handful of vectorized gathers instead of a
+Python loop per link: `visited` is a bool array indexed by id, the
+frontier is an int32 array, and `parents` records the id each page was
+reached from so paths are rebuilt only once the target is found.
+"""
+import numpy as np
+
+NO_PARENT = -1
+# Distances are stored as uint8; this marks pages the origin cannot reach
+UNREACHABLE = 255
+# Caps how many edges one gather materializes so huge levels stay within memory
+MAX_EDGES_PER_CHUNK = 1 << 22
+
+
+def _gather(offsets, targets, frontier):
+    """Yields (neighbors, owners) for every edge leaving the frontier, chunk by chunk."""
+    starts = np.asarray(offsets[frontier], dtype=np.int64)
+    counts = np.asarray(offsets[frontier + 1], dtype=np.int64) - starts
+    cumulative = np.cumsum(counts)
+    chunk_start = 0
+    while chunk_start < len(frontier):
+        done = cumulative[chunk_start - 1] if chunk_start else 0
+        chunk_end = int(np.searchsorted(cumulative, done + MAX_EDGES_PER_CHUNK, side="right"))
+        chunk_end = max(chunk_end, chunk_start + 1)
+        chunk_counts = counts[chunk_start:chunk_end]
+        total = int(chunk_counts.sum())
+        if total:
+            # Offset of each edge within its row, added to that row's start
+            row_starts = np.repeat(starts[chunk_start:chunk_end], chunk_counts)
+            within_row = np.arange(total) - np.repeat(np.cumsum(chunk_counts) - chunk_counts, chunk_counts)
+            neighbors = np.asarray(targets[row_starts + within_row], dtype=np.int32)
+            owners = np.repeat(frontier[chunk_start:chunk_end], chunk_counts)
+            yield neighbors, owners
+        chunk_start = chunk_end
+
+
+def expand_level(offsets, targets, frontier, visited, parents):
+    """Marks and returns the unvisited pages one hop from `frontier`."""
+    next_levels = []
+    for neighbors, owners in _gather(offsets, targets, frontier):
+        fresh = ~visited[neighbors]
+        neighbors, owners = neighbors[fresh], owners[fresh]
+        neighbors, first = np.unique(neighbors, return_index=True)
+        visited[neighbors] = True
+        parents[neighbors] = owners[first]
+        next_levels.append(neighbors)
+    if not next_levels:
+        return np.empty(0, dtype=np.int32)
+    return np.concatenate(next_levels)
+
+
+def trace(parents, page_id):
+    path = [page_id]
+    while parents[path[-1]] != NO_PARENT:
+        path.append(int(parents[path[-1]]))
+    return path
+
+
+def bfs_tree(offsets, targets, origin):
+    """Hop distance (uint8) and BFS parent (int32) of every page reachable from `origin`."""
+    node_count = len(offsets) - 1
+    visited = np.zeros(node_count, dtype=bool)
+    parents = np.full(node_count, NO_PARENT, dtype=np.int32)
+    distances = np.full(node_count, UNREACHABLE, dtype=np.uint8)
+    visited[origin] = True
+    distances[origin] = 0
+    frontier = np.array([origin], dtype=np.int32)
+    depth = 0
+    while len(frontier) and depth < UNREACHABLE - 1:
+        depth += 1
+        frontier = expand_level(offsets, targets, frontier, visited, parents)
+        distances[frontier] = depth
+    return distances, parents
+
+
+def bfs_path(offsets, targets, start, end, max_depth):
+    """Shortest path of ids from start to end; [] when unreachable, None past max_depth."""
+    node_count = len(offsets) - 1
+    if start == end:
+        return [start]
+    visited = np.zeros(node_count, dtype=bool)
+    parents = np.full(node_count, NO_PARENT, dtype=np.int32)
+    visited[start] = True
+    frontier = np.array([start], dtype=np.int32)
+    for depth in range(max_depth):
+        frontier = expand_level(offsets, targets, frontier, visited, parents)
+        if visited[end]:
+            return trace(parents, end)[::-1]
+        if not len(frontier):
+            return []
+    return None
+
+
+def bidirectional_path(offsets, targets, in_offsets, in_targets, start, end, max_depth):
+    """Same contract as bfs_path, growing the smaller of a forward and a backward frontier."""
+    node_count = len(offsets) - 1
+    if start == end:
+        return [start]
+    sides = []
+    for origin, side_offsets, side_targets in ((start, offsets, targets), (end, in_offsets, in_targets)):
+        visited = np.zeros(node_count, dtype=bool)
+        parents = np.full(node_count, NO_PARENT, dtype=np.int32)
+        visited[origin] = True
+        sides.append([side_offsets, side_targets, np.array([origin], dtype=np.int32), visited, parents])
+    forward, backward = sides
+    for depth in range(max_depth):
+        side = forward if len(forward[2]) <= len(backward[2]) else backward
+        side_offsets, side_targets, frontier, visited, parents = side
+        side[2] = expand_level(side_offsets, side_targets, frontier, visited, parents)
+        if not len(side[2]):
+            return []
+        meeting = side[2][forward[3][side[2]] & backward[3][side[2]]]
+        if len(meeting):
+            # Every candidate is equally deep on this side; take the one closest on the other
+            paths = [trace(forward[4], int(page_id))[::-1] + trace(backward[4], int(page_id))[1:] for page_id in meeting]
+            return min(paths, key=len)
+    return None
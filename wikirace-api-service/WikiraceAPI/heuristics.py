@@ -0,0 +1,63 @@
+import math
+import re
+from collections import Counter
+from WikiraceAPI.titles import title_table
+
+TITLE_TOKEN = re.compile(r"[^\W_]+")
+
+
+def title_tokens(page_id):
+    """Lower-case words of a page's title, ignoring ones too short to carry meaning."""
+    return {token for token in TITLE_TOKEN.findall(title_table.title(page_id).lower()) if len(token) > 2}
+
+
+class TargetProfile:
+    """Estimates how close a page is to the target from the pages around the target.
+
+    Two signals, each scaled to [0, 1]:
+    - title similarity: TF-IDF of a title's words against the words of the
+      target's neighbourhood (its links and backlinks); document frequencies
+      come from every title seen so far, so common words count for little.
+    - link overlap: the share of a fetched page's links that land in the
+      target's neighbourhood. Unfetched pages inherit it from their parent.
+    """
+
+    def __init__(self, end, links, backlinks):
+        self.end = end
+        self.backlinks = set(backlinks)
+        self.neighbourhood = self.backlinks.union(links)
+        self.term_counts = Counter()
+        for page_id in self.neighbourhood:
+            self.term_counts.update(title_tokens(page_id))
+        # The target's own title words weigh as much as the most common neighbourhood word
+        end_weight = max(self.term_counts.values(), default=1)
+        for token in title_tokens(end):
+            self.term_counts[token] = end_weight
+        self.max_term_count = end_weight
+        self.document_counts = Counter()
+        self.documents = 0
+
+    def observe(self, links):
+        """Adds newly discovered titles to the document frequencies."""
+        for page_id in links:
+            self.document_counts.update(title_tokens(page_id))
+        self.documents += len(links)
+
+    def title_similarity(self, page_id):
+        tokens = title_tokens(page_id)
+        if not tokens or not self.documents:
+            return 0.0
+        log_documents = math.log(self.documents + 1)
+        weight = 0.0
+        for token in tokens:
+            idf = math.log((self.documents + 1) / (self.document_counts[token] + 1)) / log_documents
+            weight += self.term_counts[token] / self.max_term_count * idf
+        return weight / len(tokens)
+
+    def link_overlap(self, links):
+        if not links or not self.neighbourhood:
+            return 0.0
+        return len(self.neighbourhood.intersection(links)) / min(len(links), len(self.neighbourhood))
+
+    def score(self, page_id, parent_overlap):
+        return self.title_similarity(page_id) + parent_overlap
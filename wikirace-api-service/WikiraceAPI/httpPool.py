@@ -0,0 +1,133 @@
+import os
+import zlib
+import asyncio
+import logging
+import aiohttp
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Brotli is tighter than gzip on article HTML; only advertised when a decoder is installed
+ACCEPT_ENCODING = "br, gzip, deflate" if brotli else "gzip, deflate"
+
+
+class ContentDecoder:
+    """Decodes a gzip, deflate or br response body chunk by chunk, as it arrives."""
+
+    def __init__(self, encoding=""):
+        encoding = encoding.strip().lower()
+        self._flush = None
+        if encoding in ("gzip", "deflate"):
+            decoder = zlib.decompressobj(16 + zlib.MAX_WBITS if encoding == "gzip" else zlib.MAX_WBITS)
+            self._process, self._flush = decoder.decompress, decoder.flush
+        elif encoding == "br" and brotli is not None:
+            self._process = brotli.Decompressor().process
+        elif encoding in ("", "identity"):
+            self._process = None
+        else:
+            raise ValueError(f"Unsupported Content-Encoding: {encoding}")
+
+    def decompress(self, chunk):
+        return self._process(chunk) if self._process else chunk
+
+    def flush(self):
+        return self._flush() if self._flush else b""
+
+
+def decode_body(body, encoding=""):
+    decoder = ContentDecoder(encoding)
+    return decoder.decompress(body) + decoder.flush()
+
+
+class ConnectionPool:
+    """One long-lived aiohttp session per event loop, shared by every search.
+
+    Warm invocations reuse pooled keep-alive connections instead of paying
+    DNS, TCP and TLS setup again. The container app opens it on startup and
+    closes it on shutdown. Under Lambda, and in scripts, it is opened lazily
+    on first use and kept for the life of the process.
+
+    Bodies are requested compressed and left encoded: readers decode them
+    with ContentDecoder, so the bytes they count are the bytes transferred.
+    """
+
+    def __init__(self, limit=100, limit_per_host=50, keepalive_timeout=60, dns_ttl=300):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_ttl = dns_ttl
+        self.connections_opened = 0
+        self.connections_reused = 0
+        self.dns_cache_hits = 0
+        self.dns_cache_misses = 0
+        self._session = None
+        self._loop = None
+
+    def _trace_config(self):
+        trace_config = aiohttp.TraceConfig()
+
+        async def on_connection_create_end(session, context, params):
+            self.connections_opened += 1
+
+        async def on_connection_reuseconn(session, context, params):
+            self.connections_reused += 1
+
+        async def on_dns_cache_hit(session, context, params):
+            self.dns_cache_hits += 1
+
+        async def on_dns_cache_miss(session, context, params):
+            self.dns_cache_misses += 1
+
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+        trace_config.on_dns_cache_hit.append(on_dns_cache_hit)
+        trace_config.on_dns_cache_miss.append(on_dns_cache_miss)
+        return trace_config
+
+    async def get_session(self):
+        loop = asyncio.get_running_loop()
+        if self._session is not None and not self._session.closed and self._loop is loop:
+            return self._session
+        connector = aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            keepalive_timeout=self.keepalive_timeout,
+            ttl_dns_cache=self.dns_ttl,
+            enable_cleanup_closed=True,
+        )
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            auto_decompress=False,
+            headers={"Accept-Encoding": ACCEPT_ENCODING},
+            trace_configs=[self._trace_config()],
+        )
+        self._loop = loop
+        logger.info(f"Opened HTTP connection pool (limit {self.limit}, {self.limit_per_host} per host)")
+        return self._session
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._loop = None
+
+    def metrics(self):
+        return {
+            "open": self._session is not None and not self._session.closed,
+            "connections_opened": self.connections_opened,
+            "connections_reused": self.connections_reused,
+            "dns_cache_hits": self.dns_cache_hits,
+            "dns_cache_misses": self.dns_cache_misses,
+        }
+
+
+http_pool = ConnectionPool(
+    limit=int(os.getenv("HTTP_POOL_LIMIT", "100")),
+    limit_per_host=int(os.getenv("HTTP_POOL_LIMIT_PER_HOST", "50")),
+    keepalive_timeout=float(os.getenv("HTTP_KEEPALIVE_TIMEOUT", "60")),
+    dns_ttl=int(os.getenv("HTTP_DNS_CACHE_TTL", "300")),
+)
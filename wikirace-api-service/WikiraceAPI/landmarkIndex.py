@@ -0,0 +1,167 @@
+import os
+import json
+import time
+import shutil
+import logging
+
+logger = logging.getLogger(__name__)
+
+# ---------- File Layout ----------
+# <graph index>/landmarks           symlink to the current landmarks-<timestamp>/ build
+# <graph index>/landmarks-<ts>/
+#   meta.json          hub ids plus the node and edge counts of the graph it was built from
+#   from_dist.npy      uint8 [page, hub]: hops from the hub to the page (255 = unreachable)
+#   from_parents.npy   int32 [page, hub]: the page before it on the hub's shortest path to it
+#   to_dist.npy        uint8 [page, hub]: hops from the page to the hub
+#   to_next.npy        int32 [page, hub]: the page after it on its shortest path to the hub
+# Rows are per page, so the bounds for one page are a single contiguous read.
+# NumPy is imported on first use, as in graphIndex.
+LANDMARK_FILES = ("from_dist", "from_parents", "to_dist", "to_next")
+LANDMARK_DIR = "landmarks"
+HUB_COUNT = 16
+
+
+def pick_hubs(graph_index, hub_count):
+    """The most linked-to pages: most races pass through at least one of them."""
+    import numpy as np
+    in_degree = np.diff(np.asarray(graph_index.in_offsets, dtype=np.int64))
+    hub_count = min(hub_count, graph_index.node_count)
+    hubs = np.argpartition(in_degree, -hub_count)[-hub_count:]
+    return hubs[np.argsort(-in_degree[hubs], kind="stable")].astype(np.int32)
+
+
+def write_landmark_index(graph_index, hub_count=HUB_COUNT):
+    """Builds a new landmark set next to the graph index and atomically switches to it."""
+    import numpy as np
+    from WikiraceAPI.graphSearch import bfs_tree
+    hubs = pick_hubs(graph_index, hub_count)
+    shape = (graph_index.node_count, len(hubs))
+    arrays = {
+        "from_dist": np.empty(shape, dtype=np.uint8),
+        "from_parents": np.empty(shape, dtype=np.int32),
+        "to_dist": np.empty(shape, dtype=np.uint8),
+        "to_next": np.empty(shape, dtype=np.int32),
+    }
+    for column, hub in enumerate(hubs):
+        started = time.time()
+        arrays["from_dist"][:, column], arrays["from_parents"][:, column] = bfs_tree(graph_index.offsets, graph_index.targets, hub)
+        # A BFS over "what links here" from the hub gives every page's distance *to* it,
+        # and its parent there is the next hop towards the hub
+        arrays["to_dist"][:, column], arrays["to_next"][:, column] = bfs_tree(graph_index.in_offsets, graph_index.in_targets, hub)
+        logger.info(f"Landmark {graph_index.title(int(hub))} done in {time.time() - started:.1f}s")
+
+    build = os.path.join(graph_index.path, f"{LANDMARK_DIR}-{int(time.time() * 1000)}")
+    os.makedirs(build)
+    for name, array in arrays.items():
+        np.save(os.path.join(build, f"{name}.npy"), array)
+    with open(os.path.join(build, "meta.json"), "w") as f:
+        json.dump({"hubs": hubs.tolist(), "nodes": graph_index.node_count, "edges": graph_index.edge_count}, f)
+
+    # Swap the symlink in one rename so readers see either the old build or the new one
+    link = os.path.join(graph_index.path, LANDMARK_DIR)
+    previous = os.path.realpath(link) if os.path.islink(link) else None
+    temporary_link = f"{link}.tmp"
+    if os.path.lexists(temporary_link):
+        os.remove(temporary_link)
+    os.symlink(os.path.basename(build), temporary_link)
+    os.replace(temporary_link, link)
+    # Processes still mapping the old files keep them until they reload
+    if previous and previous != os.path.realpath(build):
+        shutil.rmtree(previous, ignore_errors=True)
+    logger.info(f"Wrote {len(hubs)} landmarks to {build}")
+    return build
+
+
+class LandmarkIndex:
+    """Precomputed distances to and from a few hub pages, memory-mapped.
+
+    For any start and end it gives, without searching:
+    - an upper bound and a path, start → hub → end, through the best hub
+    - a lower bound from the triangle inequality over every hub
+    When the two bounds meet, the stitched path is a shortest path.
+    """
+
+    def __init__(self, path):
+        import numpy as np
+        self.path = os.path.realpath(path)
+        with open(os.path.join(self.path, "meta.json")) as f:
+            meta = json.load(f)
+        self.hubs = meta["hubs"]
+        self.node_count = meta["nodes"]
+        self.edge_count = meta["edges"]
+        for name in LANDMARK_FILES:
+            setattr(self, name, np.load(os.path.join(self.path, f"{name}.npy"), mmap_mode="r"))
+
+    def matches(self, graph_index):
+        return (self.node_count, self.edge_count) == (graph_index.node_count, graph_index.edge_count)
+
+    def bounds(self, start, end):
+        """(lower, upper, hub column) for the hop distance from start to end.
+
+        upper is None when no hub connects them; hub is None in that case too.
+        """
+        import numpy as np
+        from WikiraceAPI.graphSearch import UNREACHABLE
+        if start == end:
+            return 0, 0, None
+        start_to = self.to_dist[start].astype(np.int16)
+        end_to = self.to_dist[end].astype(np.int16)
+        from_start = self.from_dist[start].astype(np.int16)
+        from_end = self.from_dist[end].astype(np.int16)
+        # d(start, end) >= d(hub, end) - d(hub, start) and >= d(start, hub) - d(end, hub)
+        lower = 1
+        usable = from_start != UNREACHABLE
+        if usable.any():
+            lower = max(lower, int((from_end - from_start)[usable].max()))
+        usable = end_to != UNREACHABLE
+        if usable.any():
+            lower = max(lower, int((start_to - end_to)[usable].max()))
+        through = start_to + from_end
+        through[(start_to == UNREACHABLE) | (from_end == UNREACHABLE)] = np.iinfo(np.int16).max
+        hub = int(np.argmin(through))
+        if through[hub] == np.iinfo(np.int16).max:
+            return lower, None, None
+        return lower, int(through[hub]), hub
+
+    def stitched_path(self, start, end, hub):
+        """start → hubs[hub] → end along the stored trees, with any loop cut out."""
+        hub_id = self.hubs[hub]
+        path = [start]
+        while path[-1] != hub_id:
+            path.append(int(self.to_next[path[-1], hub]))
+        tail = [end]
+        while tail[-1] != hub_id:
+            tail.append(int(self.from_parents[tail[-1], hub]))
+        path.extend(reversed(tail[:-1]))
+        # The two halves can cross; jump straight from a page's first visit to its last
+        last_seen = {page_id: position for position, page_id in enumerate(path)}
+        shortcut = []
+        position = 0
+        while position < len(path):
+            shortcut.append(path[position])
+            position = last_seen[path[position]] + 1
+        return shortcut
+
+
+_landmark_index = None
+
+
+def get_landmark_index(graph_index):
+    """Landmarks for `graph_index`, reloaded whenever a rebuild swaps the symlink.
+
+    Returns None when none are built or they were built from a different graph.
+    """
+    global _landmark_index
+    if graph_index is None:
+        return None
+    path = os.getenv("LANDMARK_INDEX_PATH") or os.path.join(graph_index.path, LANDMARK_DIR)
+    if not os.path.exists(os.path.join(path, "meta.json")):
+        return None
+    if _landmark_index is None or _landmark_index.path != os.path.realpath(path):
+        landmark_index = LandmarkIndex(path)
+        if not landmark_index.matches(graph_index):
+            logger.warning(f"Ignoring landmarks at {path}: built from a different graph index")
+            return None
+        _landmark_index = landmark_index
+        logger.info(f"Loaded {len(landmark_index.hubs)} landmarks from {landmark_index.path}")
+    return _landmark_index
@@ -0,0 +1,182 @@
+from collections import OrderedDict
+from array import array
+import os
+import time
+import sqlite3
+import logging
+from WikiraceAPI.titles import title_table
+
+logger = logging.getLogger(__name__)
+
+# Rough per-entry bookkeeping cost on top of the link strings themselves
+ENTRY_OVERHEAD_BYTES = 64
+
+
+class BoundedCache:
+    """Process-wide LRU keyed on page title, bounded by entry count and approximate bytes.
+
+    Entries expire after `ttl` seconds, or never when it is None. When
+    `db_path` is set, entries are also written to a SQLite file (e.g. under
+    /tmp) so a warm Lambda container keeps what earlier invocations
+    learned, and memory misses fall through to it. Ids only mean something
+    inside one process, so the file holds titles, and the memory tier is
+    dropped whenever the title table is emptied. Subclasses name the TABLE
+    and its value COLUMNS, and convert values to and from rows.
+    """
+
+    TABLE = None
+    COLUMNS = ()
+
+    def __init__(self, max_entries=50000, max_bytes=64 * 1024 * 1024, ttl=None, db_path=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.current_bytes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._db = None
+        if db_path:
+            self._open_db(db_path)
+        title_table.on_reset(self.clear)
+
+    def _open_db(self, db_path):
+        try:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            columns = ", ".join(f"{column} TEXT" for column in self.COLUMNS)
+            self._db.execute(f"CREATE TABLE IF NOT EXISTS {self.TABLE} (title TEXT PRIMARY KEY, expires_at REAL, {columns})")
+            self._db.execute(f"DELETE FROM {self.TABLE} WHERE expires_at < ?", (time.time(),))
+            self._db.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Disabling on-disk {self.TABLE} cache at {db_path}: {e}")
+            self._db = None
+
+    def _size_of(self, value):
+        raise NotImplementedError
+
+    def _to_row(self, value):
+        """The COLUMNS values stored for `value`."""
+        raise NotImplementedError
+
+    def _from_row(self, row):
+        raise NotImplementedError
+
+    def _expires_at(self):
+        return None if self.ttl is None else time.time() + self.ttl
+
+    def get(self, title):
+        entry = self._entries.get(title)
+        if entry is not None:
+            expires_at, size, value = entry
+            if expires_at is None or expires_at > time.time():
+                self._entries.move_to_end(title)
+                self.hits += 1
+                return value
+            self._evict(title)
+
+        row = self._get_from_disk(title)
+        if row is not None:
+            # Promoted entries keep the expiry they were written with
+            expires_at, value = row
+            self.disk_hits += 1
+            self._store(title, value, expires_at)
+            return value
+        self.misses += 1
+        return None
+
+    def set(self, title, value):
+        expires_at = self._expires_at()
+        self._store(title, value, expires_at)
+        if self._db is not None:
+            try:
+                placeholders = ", ".join("?" * (len(self.COLUMNS) + 2))
+                self._db.execute(f"INSERT OR REPLACE INTO {self.TABLE} VALUES ({placeholders})",
+                                 (title, expires_at, *self._to_row(value)))
+                self._db.commit()
+            except sqlite3.Error as e:
+                logger.error(f"Error writing {self.TABLE} cache entry: {e}")
+
+    def _get_from_disk(self, title):
+        """Returns (expires_at, value) for an unexpired row, or None."""
+        if self._db is None:
+            return None
+        try:
+            row = self._db.execute(f"SELECT expires_at, {', '.join(self.COLUMNS)} FROM {self.TABLE} WHERE title = ?",
+                                   (title,)).fetchone()
+        except sqlite3.Error as e:
+            logger.error(f"Error reading {self.TABLE} cache entry: {e}")
+            return None
+        if row is None or (row[0] is not None and row[0] < time.time()):
+            return None
+        return row[0], self._from_row(row[1:])
+
+    def _store(self, title, value, expires_at):
+        if title in self._entries:
+            self._evict(title)
+        size = self._size_of(value)
+        if size > self.max_bytes:
+            return
+        self._entries[title] = (expires_at, size, value)
+        self.current_bytes += size
+        while len(self._entries) > self.max_entries or self.current_bytes > self.max_bytes:
+            self._evict(next(iter(self._entries)))
+
+    def _evict(self, title):
+        _, size, _ = self._entries.pop(title)
+        self.current_bytes -= size
+
+    def clear(self):
+        self._entries.clear()
+        self.current_bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.current_bytes,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.disk_hits) / lookups, 3) if lookups else 0.0,
+        }
+
+
+def pack_titles(links):
+    return "\n".join(map(title_table.title, links))
+
+
+def unpack_titles(text):
+    return array("i", map(title_table.intern, text.split("\n"))) if text else array("i")
+
+
+class LinkCache(BoundedCache):
+    """Page links keyed on the page title, as array('i') of interned title ids (see TitleTable)."""
+
+    TABLE = "links"
+    COLUMNS = ("links",)
+
+    def __init__(self, max_entries=50000, max_bytes=64 * 1024 * 1024, ttl=3600, db_path=None):
+        super().__init__(max_entries, max_bytes, ttl, db_path)
+
+    def _size_of(self, links):
+        return ENTRY_OVERHEAD_BYTES + links.itemsize * len(links)
+
+    def _to_row(self, links):
+        return (pack_titles(links),)
+
+    def _from_row(self, row):
+        return unpack_titles(row[0])
+
+
+def link_cache_from_env(prefix="LINK_CACHE"):
+    db_path = os.getenv(f"{prefix}_PATH")
+    return LinkCache(
+        max_entries=int(os.getenv(f"{prefix}_MAX_ENTRIES", "50000")),
+        max_bytes=int(os.getenv(f"{prefix}_MAX_BYTES", str(64 * 1024 * 1024))),
+        ttl=float(os.getenv(f"{prefix}_TTL", "3600")),
+        db_path=db_path,
+    )
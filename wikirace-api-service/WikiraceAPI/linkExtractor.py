@@ -0,0 +1,135 @@
+from bs4 import BeautifulSoup, SoupStrainer
+from html import unescape
+import os
+import re
+
+WIKI_ORIGIN = os.getenv("WIKI_ORIGIN", "https://en.wikipedia.org")
+# MediaWiki always double-quotes attributes, so one pass over the raw bytes finds every anchor href
+ANCHOR_HREF = re.compile(rb'<a\s(?:[^>]*?\s)?href="(/wiki/[^"]*)"')
+# Scoped extraction also follows the block elements that delimit page regions
+SCOPE_TAG = re.compile(rb'<(/?)(div|table|ol|a)\b([^>]*)>', re.IGNORECASE)
+HREF_ATTRIBUTE = re.compile(rb'(?:^|\s)href="(/wiki/[^"]*)"')
+CONTENT_ID = b'id="mw-content-text"'
+# Navboxes, sidebars and reference lists: links a reader would not click to race
+EXCLUDED_CLASSES = ("navbox", "vertical-navbox", "sidebar", "reflist", "references", "mw-references-wrap", "refbegin", "metadata")
+EXCLUDED_CLASS = re.compile(rb'class="(?:[^"]*\s)?(?:' + "|".join(EXCLUDED_CLASSES).encode() + rb')(?:\s[^"]*)?"')
+# "page": every anchor; "content": only #mw-content-text; "article": content minus EXCLUDED_CLASSES
+LINK_SCOPES = ("page", "content", "article")
+DEFAULT_LINK_SCOPE = os.getenv("LINK_SCOPE", "page")
+# Longest unterminated tag we carry between chunks before giving up on it
+MAX_CARRY_BYTES = 64 * 1024
+CHUNK_SIZE = 64 * 1024
+
+
+def is_article_href(href):
+    return href.startswith('/wiki/') and not (':' in href or '#' in href or '?' in href)
+
+
+class StreamingLinkExtractor:
+    """Pulls article hrefs out of an HTML byte stream without building a DOM.
+
+    `feed` can be called with each chunk as it arrives off the socket; only
+    the tail of a tag split across two chunks is buffered. With a scope
+    other than "page", the open div/table/ol elements are tracked to know
+    whether an anchor is inside the article body or an excluded region.
+    """
+
+    def __init__(self, scope=None):
+        self.scope = scope or DEFAULT_LINK_SCOPE
+        self._carry = b""
+        self._links = {}
+        # Open block elements as (tag, inside content, inside an excluded region)
+        self._open = []
+
+    def feed(self, chunk):
+        data = self._carry + chunk
+        cut = data.rfind(b"<")
+        if cut == -1 or data.find(b">", cut) != -1:
+            cut = len(data)
+        self._scan(data[:cut])
+        self._carry = data[cut:]
+        if len(self._carry) > MAX_CARRY_BYTES:
+            self._carry = b""
+
+    def _scan(self, data):
+        if self.scope == "page":
+            for match in ANCHOR_HREF.finditer(data):
+                self._add(match.group(1))
+            return
+        for match in SCOPE_TAG.finditer(data):
+            closing, tag, attributes = match.groups()
+            tag = tag.lower()
+            in_content, excluded = self._open[-1][1:] if self._open else (False, False)
+            if tag == b"a":
+                if not closing and in_content and not excluded:
+                    href = HREF_ATTRIBUTE.search(attributes)
+                    if href:
+                        self._add(href.group(1))
+            elif closing:
+                # Close the innermost matching element; a stray closing tag is ignored
+                for depth in range(len(self._open) - 1, -1, -1):
+                    if self._open[depth][0] == tag:
+                        del self._open[depth:]
+                        break
+            else:
+                in_content = in_content or CONTENT_ID in attributes
+                excluded = excluded or (in_content and self.scope == "article" and EXCLUDED_CLASS.search(attributes) is not None)
+                self._open.append((tag, in_content, excluded))
+
+    def _add(self, href):
+        href = href.decode("utf-8", "replace")
+        if "&" in href:
+            href = unescape(href)
+        if is_article_href(href):
+            self._links[WIKI_ORIGIN + href] = None
+
+    def close(self):
+        self._scan(self._carry)
+        self._carry = b""
+        return list(self._links)
+
+
+class SoupLinkExtractor:
+    """Fallback backend: BeautifulSoup over the whole page, or the scoped region of it."""
+
+    def __init__(self, scope=None):
+        self.scope = scope or DEFAULT_LINK_SCOPE
+        self._chunks = []
+
+    def feed(self, chunk):
+        self._chunks.append(chunk)
+
+    def close(self):
+        html = b"".join(self._chunks).decode("utf-8", "replace")
+        if self.scope == "page":
+            root = BeautifulSoup(html, 'html.parser', parse_only=SoupStrainer('a', href=True))
+        else:
+            root = BeautifulSoup(html, 'html.parser').find(id="mw-content-text")
+            if root is None:
+                return []
+            if self.scope == "article":
+                for region in root.find_all(class_=EXCLUDED_CLASSES):
+                    region.decompose()
+        links = {}
+        for link_tag in root.find_all('a', href=True):
+            href = link_tag['href']
+            if is_article_href(href):
+                links[WIKI_ORIGIN + href] = None
+        return list(links)
+
+
+EXTRACTORS = {
+    "stream": StreamingLinkExtractor,
+    "soup": SoupLinkExtractor,
+}
+DEFAULT_EXTRACTOR = os.getenv("LINK_EXTRACTOR", "stream")
+
+
+def new_link_extractor(backend=None, scope=None):
+    return EXTRACTORS[backend or DEFAULT_EXTRACTOR](scope)
+
+
+def extract_links(html, backend=None, scope=None):
+    extractor = new_link_extractor(backend, scope)
+    extractor.feed(html.encode("utf-8") if isinstance(html, str) else html)
+    return extractor.close()
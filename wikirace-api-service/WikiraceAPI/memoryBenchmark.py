@@ -0,0 +1,141 @@
+"""Peak RSS of the live BFS per depth: copied ancestry lists vs. parent pointers.
+
+Links come from a deterministic synthetic backend and endpoint redirect
+resolution is skipped, so no requests are made and every strategy sees
+the same graph. Each (strategy, depth) runs in its
+own process so the peaks do not contaminate each other. "deepening" is the
+iterative deepening mode, spilling to disk past --frontier-budget-mb.
+
+    python -m WikiraceAPI.memoryBenchmark --depths 1 2 3 --degree 80
+    python -m WikiraceAPI.memoryBenchmark --depths 4 --frontier-budget-mb 16
+"""
+from array import array
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import time
+import zlib
+from WikiraceAPI import wikiSearch
+from WikiraceAPI.fetchBackends import FetchBackend
+from WikiraceAPI.titles import WIKI_BASE_URL, title_table
+from WikiraceAPI.httpPool import http_pool
+
+UNREACHABLE = WIKI_BASE_URL + "Unreachable_page"
+
+
+class SyntheticBackend(FetchBackend):
+    """Every page links to `degree` pseudo-random pages, derived from its URL."""
+
+    name = "synthetic"
+
+    def __init__(self, degree, pages):
+        self.degree = degree
+        self.pages = pages
+        self.fetches = 0
+
+    def links(self, page_id):
+        rng = random.Random(zlib.crc32(title_table.title(page_id).encode("utf-8")))
+        return array("i", (title_table.intern(f"Page {rng.randrange(self.pages)}") for _ in range(self.degree)))
+
+    async def iter_links(self, page_ids, session):
+        for page_id in page_ids:
+            self.fetches += 1
+            yield page_id, self.links(page_id)
+
+
+async def synthetic_targets(start, ends):
+    """Stands in for wikiSearch.canonical_targets: synthetic pages have no redirects to resolve."""
+    return start, list(ends)
+
+
+async def path_copy_bfs(start, end, backend, max_depth):
+    """The search loop as it was before parent pointers, kept for comparison."""
+    start, end = title_table.intern_url(start), title_table.intern_url(end)
+    queue = [(start, [start])]
+    visited = set([start])
+    steps = 0
+    while queue:
+        current_level = dict(queue)
+        queue = []
+        steps += 1
+        async for url, links in backend.iter_links(list(current_level), None):
+            path = current_level[url]
+            if end in links:
+                return path + [end]
+            for link in links:
+                if link not in visited:
+                    visited.add(link)
+                    queue.append((link, path + [link]))
+        if steps >= max_depth:
+            return None
+    return None
+
+
+async def parent_pointer_bfs(start, end, backend, max_depth):
+    try:
+        return await wikiSearch.find_wikipedia_path(start, end, backend=backend, max_depth=max_depth)
+    finally:
+        await http_pool.close()
+
+
+async def deepening_bfs(start, end, backend, max_depth):
+    try:
+        return await wikiSearch.find_wikipedia_path(start, end, mode="deepening", backend=backend, max_depth=max_depth)
+    finally:
+        await http_pool.close()
+
+
+STRATEGIES = {
+    "path-copy": path_copy_bfs,
+    "parent-pointer": parent_pointer_bfs,
+    "deepening": deepening_bfs,
+}
+
+
+def run_child(strategy, depth, degree, pages):
+    backend = SyntheticBackend(degree, pages)
+    wikiSearch.canonical_targets = synthetic_targets
+    started = time.time()
+    asyncio.run(STRATEGIES[strategy](WIKI_BASE_URL + "Page_0", UNREACHABLE, backend, depth))
+    print(json.dumps({
+        "seconds": round(time.time() - started, 2),
+        "fetches": backend.fetches,
+        # ru_maxrss is reported in kilobytes on Linux
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--depths", type=int, nargs="+", default=[1, 2, 3])
+    parser.add_argument("--degree", type=int, default=80)
+    parser.add_argument("--pages", type=int, default=5_000_000)
+    parser.add_argument("--strategies", nargs="+", choices=STRATEGIES, default=list(STRATEGIES))
+    parser.add_argument("--frontier-budget-mb", type=int, default=64, help="budget of the deepening strategy")
+    parser.add_argument("--child", nargs=2, metavar=("STRATEGY", "DEPTH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child[0], int(args.child[1]), args.degree, args.pages)
+        return
+
+    print(f"{'depth':>5} {'strategy':>15} {'fetches':>9} {'seconds':>8} {'peak RSS (MB)':>14}")
+    for depth in args.depths:
+        for strategy in args.strategies:
+            output = subprocess.run(
+                [sys.executable, "-m", "WikiraceAPI.memoryBenchmark", "--child", strategy, str(depth),
+                 "--degree", str(args.degree), "--pages", str(args.pages)],
+                capture_output=True, text=True, check=True,
+                env=dict(os.environ, SEARCH_FRONTIER_BUDGET_MB=str(args.frontier_budget_mb)),
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            print(f"{depth:>5} {strategy:>15} {result['fetches']:>9} {result['seconds']:>8} {result['peak_rss_mb']:>14}")
+
+
+if __name__ == "__main__":
+    main()
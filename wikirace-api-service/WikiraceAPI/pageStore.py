@@ -0,0 +1,69 @@
+from collections import namedtuple
+import os
+from WikiraceAPI.linkCache import BoundedCache, ENTRY_OVERHEAD_BYTES, pack_titles, unpack_titles
+
+StoredPage = namedtuple("StoredPage", "etag last_modified links")
+
+
+class PageStore(BoundedCache):
+    """ETag / Last-Modified and extracted links of every article fetched, keyed on title.
+
+    Unlike the link cache, entries do not expire: once the link cache's
+    copy is too old, the page is fetched again with If-None-Match /
+    If-Modified-Since, and a 304 reuses the stored links.
+    """
+
+    TABLE = "pages"
+    COLUMNS = ("etag", "last_modified", "links")
+
+    def __init__(self, max_entries=50000, max_bytes=64 * 1024 * 1024, db_path=None):
+        super().__init__(max_entries, max_bytes, ttl=None, db_path=db_path)
+        self.not_modified = 0
+        self.modified = 0
+
+    @staticmethod
+    def validators(page):
+        """Conditional request headers for a stored page (or None)."""
+        headers = {}
+        if page is not None and page.etag:
+            headers["If-None-Match"] = page.etag
+        if page is not None and page.last_modified:
+            headers["If-Modified-Since"] = page.last_modified
+        return headers
+
+    def revalidated(self, not_modified):
+        if not_modified:
+            self.not_modified += 1
+        else:
+            self.modified += 1
+
+    def set(self, title, etag, last_modified, links):
+        if etag is None and last_modified is None:
+            return
+        super().set(title, StoredPage(etag, last_modified, links))
+
+    def _size_of(self, page):
+        return ENTRY_OVERHEAD_BYTES + page.links.itemsize * len(page.links)
+
+    def _to_row(self, page):
+        return page.etag, page.last_modified, pack_titles(page.links)
+
+    def _from_row(self, row):
+        return StoredPage(row[0], row[1], unpack_titles(row[2]))
+
+    def stats(self):
+        revalidations = self.not_modified + self.modified
+        return {
+            **super().stats(),
+            "not_modified": self.not_modified,
+            "modified": self.modified,
+            "not_modified_rate": round(self.not_modified / revalidations, 3) if revalidations else 0.0,
+        }
+
+
+def page_store_from_env(prefix="PAGE_STORE"):
+    return PageStore(
+        max_entries=int(os.getenv(f"{prefix}_MAX_ENTRIES", "50000")),
+        max_bytes=int(os.getenv(f"{prefix}_MAX_BYTES", str(64 * 1024 * 1024))),
+        db_path=os.getenv(f"{prefix}_PATH"),
+    )
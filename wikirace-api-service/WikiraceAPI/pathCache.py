@@ -0,0 +1,76 @@
+from collections import OrderedDict
+import os
+import time
+
+
+class PathCache:
+    """LRU of solved paths keyed on the canonical (start, end) URL pair, with a TTL.
+
+    A path is stored once and indexed under every suffix: if A → B → C → D
+    is a shortest path, so are B → C → D and C → D. Reversed pairs are not
+    reused, since links only go one way.
+
+    Entries remember whether the path is known to be shortest; lookups
+    that need a shortest path skip the others (e.g. guided search results).
+    """
+
+    def __init__(self, max_entries=10000, ttl=3600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.suffix_hits = 0
+        self.misses = 0
+        # (start, end) -> (expires_at, path, offset into path, shortest)
+        self._entries = OrderedDict()
+
+    def get(self, start, end, shortest=True, count_miss=True):
+        entry = self._entries.get((start, end))
+        if entry is not None:
+            expires_at, path, offset, is_shortest = entry
+            if expires_at <= time.time():
+                del self._entries[(start, end)]
+            elif is_shortest or not shortest:
+                self._entries.move_to_end((start, end))
+                self.hits += 1
+                if offset:
+                    self.suffix_hits += 1
+                return list(path[offset:])
+        if count_miss:
+            self.misses += 1
+        return None
+
+    def set(self, path, shortest=True):
+        if len(path) < 2:
+            return
+        path = tuple(path)
+        expires_at = time.time() + self.ttl
+        end = path[-1]
+        for offset, start in enumerate(path[:-1]):
+            existing = self._entries.get((start, end))
+            # Don't let a merely short path replace a live shortest one
+            if existing is not None and existing[3] and not shortest and existing[0] > time.time():
+                continue
+            self._entries[(start, end)] = (expires_at, path, offset, shortest)
+            self._entries.move_to_end((start, end))
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "suffix_hits": self.suffix_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+def path_cache_from_env(prefix="PATH_CACHE"):
+    return PathCache(
+        max_entries=int(os.getenv(f"{prefix}_MAX_ENTRIES", "10000")),
+        ttl=float(os.getenv(f"{prefix}_TTL", "3600")),
+    )
@@ -0,0 +1,130 @@
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+from datetime import datetime, timezone
+import os
+import time
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Classic token bucket: `rate` tokens per second, holding at most `burst`."""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.acquired = 0
+        self.wait_seconds = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        started = time.monotonic()
+        # The lock keeps waiters in FIFO order instead of racing for each token
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self.blocked_until:
+                    await asyncio.sleep(self.blocked_until - now)
+                    continue
+                self._refill(now)
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    break
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+        waited = time.monotonic() - started
+        self.acquired += 1
+        self.wait_seconds += waited
+        return waited
+
+    def block_for(self, seconds):
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+        self.tokens = 0.0
+
+    def metrics(self):
+        self._refill(time.monotonic())
+        return {
+            "rate": self.rate,
+            "burst": self.burst,
+            "tokens": round(self.tokens, 2),
+            "acquired": self.acquired,
+            "wait_seconds": round(self.wait_seconds, 3),
+            "blocked_for": round(max(0.0, self.blocked_until - time.monotonic()), 3),
+        }
+
+
+class RateLimiter:
+    """Global plus per-host token buckets, with Retry-After back-off per host."""
+
+    def __init__(self, rate=50.0, burst=20, host_rate=None, host_burst=None, default_retry_after=5.0):
+        self.global_bucket = TokenBucket(rate, burst)
+        self.host_rate = host_rate or rate
+        self.host_burst = host_burst or burst
+        self.default_retry_after = default_retry_after
+        self.host_buckets = {}
+        self.throttled = 0
+
+    def _host_bucket(self, host):
+        bucket = self.host_buckets.get(host)
+        if bucket is None:
+            bucket = self.host_buckets[host] = TokenBucket(self.host_rate, self.host_burst)
+        return bucket
+
+    async def acquire(self, url):
+        host = urlsplit(url).hostname
+        waited = await self._host_bucket(host).acquire()
+        return waited + await self.global_bucket.acquire()
+
+    def throttle(self, url, retry_after=None):
+        """Pauses a host after a 429/503, honouring its Retry-After header."""
+        delay = parse_retry_after(retry_after)
+        if delay is None:
+            delay = self.default_retry_after
+        host = urlsplit(url).hostname
+        self.throttled += 1
+        logger.warning(f"Throttled by {host}, backing off for {delay:.1f}s")
+        self._host_bucket(host).block_for(delay)
+        return delay
+
+    def metrics(self):
+        return {
+            "throttled": self.throttled,
+            "global": self.global_bucket.metrics(),
+            "hosts": {host: bucket.metrics() for host, bucket in self.host_buckets.items()},
+        }
+
+
+def parse_retry_after(value):
+    """Retry-After is either delta-seconds or an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def rate_limiter_from_env():
+    host_rate = os.getenv("WIKI_HOST_RATE_LIMIT")
+    host_burst = os.getenv("WIKI_HOST_RATE_BURST")
+    return RateLimiter(
+        rate=float(os.getenv("WIKI_RATE_LIMIT", "50")),
+        burst=int(os.getenv("WIKI_RATE_BURST", "20")),
+        host_rate=float(host_rate) if host_rate else None,
+        host_burst=int(host_burst) if host_burst else None,
+    )
@@ -0,0 +1,246 @@
+"""Search benchmark against a local fake Wikipedia serving a synthetic graph.
+
+Builds a deterministic link graph with power-law in- and out-degrees, where
+pages belong to topics that appear in their titles and link mostly within
+their topic. The graph is served by FakeWikipedia with a fixed latency per
+request. A fixed suite of (start, end) pairs at known distances is then
+searched with every mode and fetch backend. Each search runs in its own
+process, so caches start cold and the peaks do not contaminate each other.
+
+Reports HTTP requests served, wall time, peak RSS, pages expanded per
+second and links per expanded page, plus found vs. shortest hops.
+
+With --navbox N, every article also gets a navbox of its topic's N most
+linked pages, so LINK_SCOPE settings (html backend only) can be compared.
+
+    python -m WikiraceAPI.searchBenchmark --pages 20000 --latency 0.02
+    python -m WikiraceAPI.searchBenchmark --modes bfs guided --backends api --pairs 4
+    python -m WikiraceAPI.searchBenchmark --backends html --navbox 30 --link-scopes page article
+"""
+from collections import deque
+import argparse
+import asyncio
+import bisect
+import itertools
+import json
+import os
+import random
+import resource
+import sys
+import time
+from WikiraceAPI.fakeWikipedia import FakeWikipedia
+from WikiraceAPI.linkExtractor import LINK_SCOPES
+
+TOPICS = ("Anatomy", "Astronomy", "Botany", "Chemistry", "Economics", "Geology", "History", "Linguistics",
+          "Mathematics", "Medicine", "Music", "Painting", "Philosophy", "Physics", "Sports", "Zoology")
+# Share of a page's links that stay within its topic
+TOPIC_AFFINITY = 0.6
+DEFAULT_MODES = ("bfs", "bidirectional", "guided", "deepening")
+DEFAULT_BACKENDS = ("api", "html")
+
+
+# ---------- Synthetic Graph ----------
+def page_title(page):
+    return f"{TOPICS[page % len(TOPICS)]} {page}"
+
+
+def power_law_graph(pages, degree=40, exponent=2.2, seed=0):
+    """Maps title -> linked titles for `pages` pages averaging `degree` links each.
+
+    Out-degrees follow a Pareto distribution (a few pages with thousands of
+    links, so the API backend has to follow continuations). Link targets
+    are drawn with weight rank^(-1 / (exponent - 1)), which gives in-degrees
+    a power-law tail with that exponent: a handful of hubs most paths go
+    through, like real Wikipedia.
+    """
+    rng = random.Random(seed)
+    alpha = 1 / (exponent - 1)
+    weights = [(page + 1) ** -alpha for page in range(pages)]
+    everywhere = (list(range(pages)), list(itertools.accumulate(weights)))
+    by_topic = []
+    for topic in range(len(TOPICS)):
+        members = list(range(topic, pages, len(TOPICS)))
+        by_topic.append((members, list(itertools.accumulate(weights[page] for page in members))))
+    # Pareto with shape 1.5 has mean 3 * scale
+    scale = degree / 3
+    graph = {}
+    for page in range(pages):
+        out_degree = min(max(1, int(scale * rng.paretovariate(1.5))), pages - 1, degree * 50)
+        in_topic = sum(rng.random() < TOPIC_AFFINITY for _ in range(out_degree))
+        links = set()
+        for (members, cum_weights), count in ((by_topic[page % len(TOPICS)], in_topic),
+                                              (everywhere, out_degree - in_topic)):
+            for _ in range(count):
+                links.add(members[bisect.bisect(cum_weights, rng.random() * cum_weights[-1])])
+        links.discard(page)
+        graph[page_title(page)] = [page_title(link) for link in links]
+    return graph
+
+
+def topic_navboxes(pages, size):
+    """Maps every title to its topic's `size` most linked pages, other than itself."""
+    navboxes = {}
+    for page in range(pages):
+        hubs = range(page % len(TOPICS), min(pages, size * len(TOPICS)), len(TOPICS))
+        navboxes[page_title(page)] = [page_title(hub) for hub in hubs if hub != page]
+    return navboxes
+
+
+def with_navboxes(graph, navboxes):
+    return {title: list(dict.fromkeys(links + navboxes.get(title, []))) for title, links in graph.items()}
+
+
+def distances_from(graph, start):
+    distances = {start: 0}
+    queue = deque([start])
+    while queue:
+        page = queue.popleft()
+        for link in graph[page]:
+            if link not in distances:
+                distances[link] = distances[page] + 1
+                queue.append(link)
+    return distances
+
+
+def pick_pairs(graph, count, min_hops=2, max_hops=4, seed=0):
+    """`count` (start, end, hops) pairs, spread evenly over [min_hops, max_hops]."""
+    rng = random.Random(seed)
+    titles = list(graph)
+    pairs = []
+    wanted = itertools.cycle(range(min_hops, max_hops + 1))
+    hops = next(wanted)
+    for _ in range(count * 100):
+        if len(pairs) == count:
+            break
+        start = rng.choice(titles)
+        at_distance = [title for title, distance in distances_from(graph, start).items() if distance == hops]
+        if at_distance:
+            pairs.append((start, rng.choice(sorted(at_distance)), hops))
+            hops = next(wanted)
+    return pairs
+
+
+# ---------- Child Process ----------
+def run_child(mode, backend_name, start, end):
+    from WikiraceAPI import wikiSearch
+    from WikiraceAPI.fetchBackends import FETCH_BACKENDS
+    from WikiraceAPI.httpPool import http_pool
+    from WikiraceAPI.titles import title_to_url
+
+    class CountingBackend(FETCH_BACKENDS[backend_name]):
+        pages = 0
+        links = 0
+
+        async def _iter(self, kind, page_ids, session, cache, fetch_batch):
+            async for page_id, links in super()._iter(kind, page_ids, session, cache, fetch_batch):
+                self.pages += 1
+                self.links += len(links)
+                yield page_id, links
+
+    backend = CountingBackend()
+
+    async def search():
+        try:
+            return await wikiSearch.find_wikipedia_path(title_to_url(start), title_to_url(end), mode=mode, backend=backend)
+        finally:
+            await http_pool.close()
+
+    started = time.time()
+    path = asyncio.run(search())
+    print(json.dumps({
+        "seconds": round(time.time() - started, 3),
+        "pages": backend.pages,
+        "branching": round(backend.links / backend.pages, 1) if backend.pages else 0.0,
+        "hops": len(path) - 1 if path else None,
+        # ru_maxrss is reported in kilobytes on Linux
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }))
+
+
+async def run_case(server, origin, mode, backend, scope, start, end):
+    env = dict(os.environ, WIKI_ORIGIN=origin, WIKI_RATE_LIMIT="100000", WIKI_RATE_BURST="10000", LINK_SCOPE=scope)
+    # Only the live fetch path is measured: no on-disk caches or graph snapshots
+    for name in ("GRAPH_INDEX_PATH", "LANDMARK_INDEX_PATH", "LINK_CACHE_PATH", "BACKLINK_CACHE_PATH"):
+        env.pop(name, None)
+    requests_before = server.requests
+    child = await asyncio.create_subprocess_exec(
+        sys.executable, "-m", "WikiraceAPI.searchBenchmark", "--child", mode, backend, start, end,
+        env=env, stdout=asyncio.subprocess.PIPE,
+    )
+    output, _ = await child.communicate()
+    if child.returncode:
+        raise RuntimeError(f"{mode} / {backend} search from {start} to {end} failed")
+    result = json.loads(output.decode().strip().splitlines()[-1])
+    result["requests"] = server.requests - requests_before
+    return result
+
+
+async def run_suite(args):
+    started = time.time()
+    graph = power_law_graph(args.pages, args.degree, args.exponent, args.seed)
+    navboxes = topic_navboxes(args.pages, args.navbox) if args.navbox else {}
+    # Pairs are picked on article-body links so they are reachable with any link scope
+    pairs = pick_pairs(graph, args.pairs, args.min_hops, args.max_hops, args.seed)
+    full_graph = with_navboxes(graph, navboxes)
+    full_hops = {(start, end): distances_from(full_graph, start)[end] for start, end, _ in pairs}
+    links = sum(len(links) for links in full_graph.values())
+    print(f"{len(graph)} pages, {links} links, {len(pairs)} pairs, {args.latency * 1000:.0f}ms latency "
+          f"(built in {time.time() - started:.1f}s)")
+    server = FakeWikipedia(graph, latency=args.latency, navboxes=navboxes)
+    origin = await server.start()
+    print(f"{'mode':>13} {'backend':>7} {'scope':>7} {'pair':>34} {'hops':>6} {'requests':>8} {'seconds':>8} "
+          f"{'pages/s':>8} {'links/page':>10} {'peak RSS (MB)':>14}")
+    try:
+        for mode, backend, scope in itertools.product(args.modes, args.backends, args.link_scopes):
+            # The API lists every link on a page, so only the html backend has a scope
+            if backend != "html" and scope != args.link_scopes[0]:
+                continue
+            totals = {"requests": 0, "seconds": 0.0, "pages": 0, "links": 0.0, "peak_rss_mb": 0.0, "shortest": 0}
+            for start, end, hops in pairs:
+                if backend != "html" or scope != "article":
+                    hops = full_hops[start, end]
+                result = await run_case(server, origin, mode, backend, scope, start, end)
+                pages_per_second = result["pages"] / result["seconds"] if result["seconds"] else 0.0
+                found = "-" if result["hops"] is None else f"{result['hops']}/{hops}"
+                print(f"{mode:>13} {backend:>7} {scope:>7} {start + ' → ' + end:>34} {found:>6} {result['requests']:>8} "
+                      f"{result['seconds']:>8.2f} {pages_per_second:>8.0f} {result['branching']:>10} {result['peak_rss_mb']:>14}")
+                totals["requests"] += result["requests"]
+                totals["seconds"] += result["seconds"]
+                totals["pages"] += result["pages"]
+                totals["links"] += result["branching"] * result["pages"]
+                totals["peak_rss_mb"] = max(totals["peak_rss_mb"], result["peak_rss_mb"])
+                totals["shortest"] += result["hops"] == hops
+            pages_per_second = totals["pages"] / totals["seconds"] if totals["seconds"] else 0.0
+            branching = round(totals["links"] / totals["pages"], 1) if totals["pages"] else 0.0
+            print(f"{mode:>13} {backend:>7} {scope:>7} {'total':>34} {str(totals['shortest']) + '/' + str(len(pairs)):>6} "
+                  f"{totals['requests']:>8} {totals['seconds']:>8.2f} {pages_per_second:>8.0f} {branching:>10} "
+                  f"{totals['peak_rss_mb']:>14}")
+    finally:
+        await server.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=20000)
+    parser.add_argument("--degree", type=int, default=40, help="mean links per page")
+    parser.add_argument("--exponent", type=float, default=2.2, help="power-law exponent of the in-degrees")
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds per request")
+    parser.add_argument("--pairs", type=int, default=6)
+    parser.add_argument("--min-hops", type=int, default=2)
+    parser.add_argument("--max-hops", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--modes", nargs="+", choices=DEFAULT_MODES, default=list(DEFAULT_MODES))
+    parser.add_argument("--backends", nargs="+", choices=DEFAULT_BACKENDS, default=list(DEFAULT_BACKENDS))
+    parser.add_argument("--navbox", type=int, default=0, help="links in each article's topic navbox")
+    parser.add_argument("--link-scopes", nargs="+", choices=LINK_SCOPES, default=["page"])
+    parser.add_argument("--child", nargs=4, metavar=("MODE", "BACKEND", "START", "END"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(*args.child)
+        return
+    asyncio.run(run_suite(args))
+
+
+if __name__ == "__main__":
+    main()
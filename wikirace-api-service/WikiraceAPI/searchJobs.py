@@ -0,0 +1,213 @@
+from collections import OrderedDict
+import os
+import json
+import time
+import uuid
+import sqlite3
+import asyncio
+import logging
+from WikiraceAPI.titles import normalize_title
+
+logger = logging.getLogger(__name__)
+
+# ---------- Global Variables ----------
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+# Finished paths are reused for this long; links change, so they are not kept forever
+JOB_RESULT_TTL = float(os.getenv("JOB_RESULT_TTL", "86400"))
+# A queued or running job not updated for this long belongs to a worker that died
+JOB_STALE_AFTER = float(os.getenv("JOB_STALE_AFTER", "900"))
+# Live workers touch their queued and running jobs this often, so long searches never look stale
+JOB_HEARTBEAT = float(os.getenv("JOB_HEARTBEAT", str(JOB_STALE_AFTER / 3)))
+ACTIVE_STATUSES = ("queued", "running")
+# Request fields besides the endpoints that can change a search's answer
+KEY_FIELDS = ("mode", "backend", "deadline", "beam_width", "landmark_tolerance", "max_depth", "frontier_budget_mb")
+
+
+def job_key(request):
+    """Requests with the same key share one job: same canonical endpoints and same search options."""
+    options = "|".join("" if request.get(field) is None else str(request[field]) for field in KEY_FIELDS)
+    return f"{normalize_title(request['start'])}|{normalize_title(request['end'])}|{options}"
+
+
+def reusable(job):
+    age = time.time() - job["updated_at"]
+    if job["status"] in ACTIVE_STATUSES:
+        return age < JOB_STALE_AFTER
+    # Failures and deadline-cut partial paths are worth another try
+    return job["status"] == "done" and not (job["result"] or {}).get("partial") and age < JOB_RESULT_TTL
+
+
+# ---------- Job Stores ----------
+class MemoryJobStore:
+    """Jobs in this process only, oldest dropped first once `max_entries` is reached."""
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self._jobs = OrderedDict()
+        self._latest = {}
+
+    def get(self, job_id):
+        return self._jobs.get(job_id)
+
+    def find(self, key):
+        job_id = self._latest.get(key)
+        return self._jobs.get(job_id) if job_id else None
+
+    def put(self, job):
+        self._jobs[job["id"]] = job
+        self._jobs.move_to_end(job["id"])
+        self._latest[job["key"]] = job["id"]
+        while len(self._jobs) > self.max_entries:
+            _, dropped = self._jobs.popitem(last=False)
+            if self._latest.get(dropped["key"]) == dropped["id"]:
+                del self._latest[dropped["key"]]
+
+
+class SqliteJobStore:
+    """Jobs in a SQLite file, shared by every process on the host and kept across restarts."""
+
+    def __init__(self, db_path):
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.execute("CREATE TABLE IF NOT EXISTS jobs (id TEXT PRIMARY KEY, key TEXT, updated_at REAL, job TEXT)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS jobs_by_key ON jobs (key, updated_at)")
+        self._db.commit()
+
+    def get(self, job_id):
+        row = self._db.execute("SELECT job FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def find(self, key):
+        row = self._db.execute("SELECT job FROM jobs WHERE key = ? ORDER BY updated_at DESC LIMIT 1", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, job):
+        self._db.execute("INSERT OR REPLACE INTO jobs VALUES (?, ?, ?, ?)",
+                         (job["id"], job["key"], job["updated_at"], json.dumps(job)))
+        self._db.commit()
+
+
+class DynamoJobStore:
+    """Jobs in a DynamoDB table with a string partition key `id`.
+
+    Set DYNAMODB_ENDPOINT_URL to use DynamoDB Local. Each key also gets a
+    `key#...` item that points at its latest job, so no index is needed.
+    """
+
+    def __init__(self, table_name, endpoint_url=None):
+        import boto3
+        self._table = boto3.resource("dynamodb", endpoint_url=endpoint_url).Table(table_name)
+
+    def get(self, job_id):
+        item = self._table.get_item(Key={"id": job_id}).get("Item")
+        return json.loads(item["job"]) if item else None
+
+    def find(self, key):
+        pointer = self._table.get_item(Key={"id": f"key#{key}"}).get("Item")
+        return self.get(pointer["job_id"]) if pointer else None
+
+    def put(self, job):
+        self._table.put_item(Item={"id": job["id"], "job": json.dumps(job)})
+        self._table.put_item(Item={"id": f"key#{job['key']}", "job_id": job["id"]})
+
+
+def job_store_from_env():
+    store = os.getenv("JOB_STORE", "memory")
+    if store == "sqlite":
+        return SqliteJobStore(os.getenv("JOB_STORE_PATH", "/tmp/wikirace-jobs.sqlite3"))
+    if store == "dynamodb":
+        return DynamoJobStore(os.getenv("JOB_TABLE", "wikirace-jobs"), os.getenv("DYNAMODB_ENDPOINT_URL"))
+    return MemoryJobStore(int(os.getenv("JOB_STORE_MAX_ENTRIES", "10000")))
+
+
+# ---------- Job Runner ----------
+class JobRunner:
+    """Runs searches on a fixed pool of worker tasks and records them in a job store.
+
+    `search(request)` is a coroutine function returning the result dict; an
+    exception with `status_code` / `detail` (e.g. HTTPException) is recorded
+    as that error. A 4xx error such as "No path found" is an answer too, so
+    the job is still "done"; anything else marks it "failed". While a job is
+    queued or running its `updated_at` is refreshed every JOB_HEARTBEAT
+    seconds, so only jobs of a dead runner go stale.
+
+    Workers only run in the container deployment, started and stopped with
+    the app. Lambda freezes the process between invocations, so there the
+    runner is never started and `running` is False.
+    """
+
+    def __init__(self, store, workers=JOB_WORKERS):
+        self.store = store
+        self.workers = workers
+        self.search = None
+        self._queue = asyncio.Queue()
+        self._tasks = []
+        # Queued and running jobs of this runner, by id
+        self._active = {}
+
+    @property
+    def running(self):
+        return bool(self._tasks)
+
+    def start(self, search):
+        self.search = search
+        self._queue = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._heartbeat()))
+        logger.info(f"Started {self.workers} search job workers")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._active = {}
+
+    def submit(self, request):
+        """Returns the job for `request`: a running or finished duplicate, or a newly queued one."""
+        key = job_key(request)
+        existing = self.store.find(key)
+        if existing is not None and reusable(existing):
+            logger.info(f"Reusing job {existing['id']} ({existing['status']}) for {key}")
+            return existing
+        now = time.time()
+        job = {"id": uuid.uuid4().hex, "key": key, "status": "queued", "request": request,
+               "result": None, "error": None, "created_at": now, "updated_at": now}
+        self.store.put(job)
+        self._active[job["id"]] = job
+        self._queue.put_nowait(job)
+        return job
+
+    def get(self, job_id):
+        return self.store.get(job_id)
+
+    def _update(self, job, **fields):
+        job.update(fields, updated_at=time.time())
+        self.store.put(job)
+
+    async def _work(self):
+        while True:
+            job = await self._queue.get()
+            self._update(job, status="running")
+            try:
+                self._update(job, status="done", result=await self.search(job["request"]))
+            except asyncio.CancelledError:
+                self._update(job, status="failed", error={"status": 503, "detail": "Search was interrupted"})
+                raise
+            except Exception as e:
+                status = getattr(e, "status_code", 500)
+                if status >= 500:
+                    logger.exception(f"Job {job['id']} failed")
+                self._update(job, status="done" if status < 500 else "failed",
+                             error={"status": status, "detail": getattr(e, "detail", str(e))})
+            finally:
+                self._active.pop(job["id"], None)
+            logger.info(f"Job {job['id']} {job['status']} after {job['updated_at'] - job['created_at']:.2f}s")
+
+    async def _heartbeat(self):
+        while True:
+            await asyncio.sleep(JOB_HEARTBEAT)
+            for job in list(self._active.values()):
+                try:
+                    self._update(job)
+                except Exception:
+                    logger.exception(f"Could not refresh job {job['id']}")
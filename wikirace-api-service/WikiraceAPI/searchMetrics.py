@@ -0,0 +1,176 @@
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+import os
+import sys
+import json
+import time
+from WikiraceAPI.linkExtractor import DEFAULT_LINK_SCOPE
+
+# ---------- Global Variables ----------
+# Lambda ships stdout to CloudWatch Logs, which turns EMF lines into metrics without any API calls
+EMF_ENABLED = os.getenv("SEARCH_METRICS_EMF", "1" if os.getenv("AWS_LAMBDA_FUNCTION_NAME") else "0") == "1"
+EMF_NAMESPACE = os.getenv("SEARCH_METRICS_NAMESPACE", "WikiraceAPI")
+# The search running in the current task, if any; fetch tasks it creates inherit it
+current_metrics = ContextVar("current_metrics", default=None)
+
+# CloudWatch metric name -> unit
+EMF_METRICS = {
+    "Fetches": "Count",
+    "MergedFetches": "Count",
+    "Throttled": "Count",
+    "BytesDownloaded": "Bytes",
+    "BytesDecoded": "Bytes",
+    "NotModified": "Count",
+    "CacheHits": "Count",
+    "CacheMisses": "Count",
+    "RateLimitWait": "Milliseconds",
+    "NetworkTime": "Milliseconds",
+    "ParseTime": "Milliseconds",
+    "SearchTime": "Milliseconds",
+    "Levels": "Count",
+    "BranchingFactor": "None",
+    "MaxFrontier": "Count",
+    "SpilledBytes": "Bytes",
+}
+
+
+# ---------- Recording ----------
+def record(**amounts):
+    """Adds to the counters of the search running in this task; a no-op outside one."""
+    metrics = current_metrics.get()
+    if metrics is not None:
+        metrics.counters.update(amounts)
+
+
+@contextmanager
+def timed(counter):
+    """Adds the seconds spent in the block to `counter` of the current search."""
+    if current_metrics.get() is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(**{counter: time.perf_counter() - started})
+
+
+class SearchMetrics:
+    """What one search spent its time and requests on.
+
+    Time counters are summed over concurrent requests, so with many fetches
+    in flight they add up to more than the search's wall time. Network time
+    is each request's time minus the time spent decoding and parsing its
+    body. Downloaded bytes are as transferred, before decompression.
+    """
+
+    def __init__(self):
+        self.mode = None
+        self.backend = None
+        # "search", or what answered without one: "path_cache", "landmarks", "offline"
+        self.source = "search"
+        self.outcome = None
+        self.counters = Counter()
+        self.levels = []
+        self._started = time.perf_counter()
+        self._finished = None
+
+    def level(self, event):
+        """Records one per-level progress event, stamped with the time since the search began."""
+        self.levels.append({**event, "elapsed_ms": self._milliseconds(time.perf_counter() - self._started)})
+
+    def finish(self, outcome):
+        self.outcome = outcome
+        self._finished = time.perf_counter()
+        if EMF_ENABLED:
+            emit_emf(self)
+
+    def cache_hit_rate(self):
+        """Share of this search's link and backlink cache lookups that hit."""
+        lookups = self.counters["cache_hits"] + self.counters["cache_misses"]
+        return round(self.counters["cache_hits"] / lookups, 3) if lookups else 0.0
+
+    @staticmethod
+    def _milliseconds(seconds):
+        return round(seconds * 1000, 1)
+
+    def as_dict(self):
+        counters = self.counters
+        elapsed = (self._finished or time.perf_counter()) - self._started
+        return {
+            "mode": self.mode,
+            "backend": self.backend,
+            "source": self.source,
+            "outcome": self.outcome,
+            "search_ms": self._milliseconds(elapsed),
+            "fetches": counters["fetches"],
+            "merged_fetches": counters["merged_fetches"],
+            "throttled": counters["throttled"],
+            "bytes_downloaded": counters["bytes"],
+            "bytes_decoded": counters["decoded_bytes"],
+            "not_modified": counters["not_modified"],
+            "rate_limit_wait_ms": self._milliseconds(counters["rate_limit_seconds"]),
+            "network_ms": self._milliseconds(counters["request_seconds"] - counters["parse_seconds"]),
+            "parse_ms": self._milliseconds(counters["parse_seconds"]),
+            "cache_hits": counters["cache_hits"],
+            "cache_misses": counters["cache_misses"],
+            # Pages expanded from backlink lists that were cut short, so the path may not be shortest
+            "sampled_backlinks": counters["sampled_backlinks"],
+            "pages_expanded": counters["pages_expanded"],
+            # Mean links per expanded page; LINK_SCOPE narrows it for the html backend
+            "branching_factor": round(counters["links_found"] / counters["pages_expanded"], 1) if counters["pages_expanded"] else 0.0,
+            # Only the html backend scopes links; the API lists every link of a page
+            "link_scope": DEFAULT_LINK_SCOPE if self.backend == "html" else None,
+            # Frontier and parent pointer bytes a deepening search moved to disk
+            "spilled_bytes": counters["spilled_bytes"],
+            "levels": self.levels,
+        }
+
+
+# ---------- Embedded Metric Format ----------
+def emf_record(metrics):
+    """One CloudWatch Embedded Metric Format object for a finished search."""
+    summary = metrics.as_dict()
+    values = {
+        "Fetches": summary["fetches"],
+        "MergedFetches": summary["merged_fetches"],
+        "Throttled": summary["throttled"],
+        "BytesDownloaded": summary["bytes_downloaded"],
+        "BytesDecoded": summary["bytes_decoded"],
+        "NotModified": summary["not_modified"],
+        "CacheHits": summary["cache_hits"],
+        "CacheMisses": summary["cache_misses"],
+        "RateLimitWait": summary["rate_limit_wait_ms"],
+        "NetworkTime": summary["network_ms"],
+        "ParseTime": summary["parse_ms"],
+        "SearchTime": summary["search_ms"],
+        "Levels": len(summary["levels"]),
+        "BranchingFactor": summary["branching_factor"],
+        "MaxFrontier": max((level["frontier"] for level in summary["levels"]), default=0),
+        "SpilledBytes": summary["spilled_bytes"],
+    }
+    return {
+        "_aws": {
+            "Timestamp": int(time.time() * 1000),
+            "CloudWatchMetrics": [{
+                "Namespace": EMF_NAMESPACE,
+                "Dimensions": [["Mode"], ["Mode", "Backend"], ["Outcome"]],
+                "Metrics": [{"Name": name, "Unit": unit} for name, unit in EMF_METRICS.items()],
+            }],
+        },
+        "Mode": summary["mode"],
+        "Backend": summary["backend"] or "none",
+        "Outcome": summary["outcome"],
+        # Not metrics, but searchable with Logs Insights next to them
+        "Source": summary["source"],
+        "LinkScope": summary["link_scope"],
+        "FrontierSizes": [level["frontier"] for level in summary["levels"]],
+        **values,
+    }
+
+
+def emit_emf(metrics):
+    # Written straight to stdout: a logging prefix would stop CloudWatch from parsing the line
+    sys.stdout.write(json.dumps(emf_record(metrics)) + "\n")
+    sys.stdout.flush()
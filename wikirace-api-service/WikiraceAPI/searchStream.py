@@ -0,0 +1,61 @@
+import json
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+# ---------- Global Variables ----------
+STREAM_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "sse": "text/event-stream",
+}
+# Proxies must pass each event through as soon as it is written
+STREAM_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+# Load balancers drop idle connections; a level on a cold cache can take a while
+HEARTBEAT_INTERVAL = 15
+
+# ---------- Helper Functions ----------
+def encode_event(event, format):
+    data = json.dumps(event)
+    if format == "sse":
+        return f"event: {event['event']}\ndata: {data}\n\n"
+    return data + "\n"
+
+def encode_heartbeat(format):
+    return ": keep-alive\n\n" if format == "sse" else json.dumps({"event": "heartbeat"}) + "\n"
+
+# ---------- Streaming ----------
+async def stream_search(search, metrics, format="ndjson"):
+    """Yields encoded progress events while `search` runs, then its final event.
+
+    `search(progress)` is a coroutine function returning the final event;
+    it calls `progress(event)` once per level and records into `metrics`,
+    whose cache hit rate each progress event carries. If the client goes
+    away the generator is closed, which cancels the search and its fetches.
+    """
+    events = asyncio.Queue()
+
+    def progress(event):
+        events.put_nowait({"event": "progress", **event, "cache_hit_rate": metrics.cache_hit_rate()})
+
+    async def run():
+        try:
+            events.put_nowait(await search(progress))
+        except Exception as e:
+            logger.exception("Streaming search failed")
+            events.put_nowait({"event": "error", "status": 500, "detail": str(e)})
+
+    task = asyncio.create_task(run())
+    try:
+        while True:
+            try:
+                event = await asyncio.wait_for(events.get(), HEARTBEAT_INTERVAL)
+            except TimeoutError:
+                yield encode_heartbeat(format)
+                continue
+            yield encode_event(event, format)
+            if event["event"] != "progress":
+                break
+    finally:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
@@ -1,13 +1,20 @@
 import time
 import asyncio
-from fastestPath import find_wikipedia_path
+from WikiraceAPI.wikiSearch import find_wikipedia_path
+from WikiraceAPI.httpPool import http_pool
+
+async def run_search(start_page, end_page):
+    try:
+        return await find_wikipedia_path(start_page, end_page)
+    finally:
+        await http_pool.close()
 
 if __name__ == "__main__":
     start_page = "https://en.wikipedia.org/wiki/Combination"
     end_page = "https://en.wikipedia.org/wiki/Guppy"
 
     start = time.time()
-    path = asyncio.run(find_wikipedia_path(start_page, end_page))
+    path = asyncio.run(run_search(start_page, end_page))
     end = time.time()
     print(f"Search completed in {end - start:.2f} seconds.")
 
@@ -0,0 +1,60 @@
+import os
+import asyncio
+from WikiraceAPI.fakeWikipedia import FakeWikipedia
+
+# Hub links to 1200 filler pages so prop=links has to follow plcontinue,
+# and Fish only reaches Guppy through a redirect
+GRAPH = {
+    "Combination": ["Mathematics", "Hub"],
+    "Mathematics": ["Hub", "Biology"],
+    "Hub": [f"Filler {i}" for i in range(1200)] + ["Fish"],
+    "Biology": ["Fish", "Mathematics"],
+    "Fish": ["Poecilia reticulata"],
+    "Guppy": ["Fish"],
+}
+REDIRECTS = {"Poecilia reticulata": "Guppy", "Millionfish": "Guppy"}
+for i in range(1200):
+    GRAPH[f"Filler {i}"] = ["Hub"]
+
+
+async def run_case(origin, server, mode, backend):
+    from WikiraceAPI import fetchBackends
+    from WikiraceAPI.wikiSearch import find_wikipedia_path, path_cache
+    from WikiraceAPI.titles import normalize_title
+    fetchBackends.link_cache.clear()
+    fetchBackends.backlink_cache.clear()
+    path_cache.clear()
+    server.requests = 0
+    from WikiraceAPI.titles import redirects
+    redirects.clear()
+    # The end is given as a lower-case alias; it should still resolve to Guppy
+    path = await find_wikipedia_path(f"{origin}/wiki/Combination", "millionfish", mode=mode, backend=backend)
+    titles = [normalize_title(url) for url in path]
+    assert titles[0] == "Combination" and titles[-1] == "Guppy", titles
+    for page, next_page in zip(titles, titles[1:]):
+        assert next_page in [REDIRECTS.get(link, link) for link in GRAPH[page]], f"{page} does not link to {next_page}"
+    print(f"{mode:>13} / {backend:<4} → {' → '.join(titles)} ({server.requests} requests)")
+    return server.requests
+
+
+async def main():
+    server = FakeWikipedia(GRAPH, REDIRECTS)
+    origin = await server.start()
+    # Point the fetch layer at the stub before it is first imported
+    os.environ["WIKI_ORIGIN"] = origin
+    os.environ.setdefault("WIKI_RATE_LIMIT", "1000")
+    os.environ.setdefault("WIKI_RATE_BURST", "100")
+    try:
+        requests = {}
+        for mode in ("bfs", "bidirectional", "guided", "deepening"):
+            for backend in ("html", "api"):
+                requests[mode, backend] = await run_case(origin, server, mode, backend)
+        assert requests["bfs", "api"] < requests["bfs", "html"]
+    finally:
+        from WikiraceAPI.httpPool import http_pool
+        await http_pool.close()
+        await server.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
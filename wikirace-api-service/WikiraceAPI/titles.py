@@ -0,0 +1,228 @@
+from collections import OrderedDict
+from contextlib import contextmanager
+from array import array
+from urllib.parse import quote, unquote, urlsplit
+import os
+import weakref
+import logging
+from WikiraceAPI.linkExtractor import WIKI_ORIGIN
+
+logger = logging.getLogger(__name__)
+
+WIKI_BASE_URL = WIKI_ORIGIN + "/wiki/"
+MAX_REDIRECTS = int(os.getenv("REDIRECT_CACHE_MAX_ENTRIES", "200000"))
+# Titles interned before the table is emptied, once no search is using it (~40MB per million)
+MAX_TITLES = int(os.getenv("TITLE_TABLE_MAX_ENTRIES", "2000000"))
+EMPTY_SLOT = -1
+
+# ---------- Title Helpers ----------
+def normalize_title(page):
+    """Canonical article title for a URL, /wiki/ href or bare title.
+
+    Mobile and desktop URLs, percent-encoding, underscores, fragments and a
+    lower-case first letter all map to the same title MediaWiki would use.
+    """
+    if "/wiki/" in page:
+        page = urlsplit(page).path if "://" in page else page.split("#", 1)[0].split("?", 1)[0]
+        page = page.split("/wiki/", 1)[1]
+    else:
+        page = page.split("#", 1)[0]
+    title = " ".join(unquote(page).replace("_", " ").split())
+    return title[:1].upper() + title[1:]
+
+def url_to_title(url):
+    return normalize_title(url)
+
+def title_to_url(title):
+    # Same characters MediaWiki leaves unescaped when it renders /wiki/ hrefs
+    return WIKI_BASE_URL + quote(title.replace(" ", "_"), safe=";@$!*(),/~:")
+
+
+class TitleTable:
+    """Interns article titles as dense int ids, one table per process.
+
+    Searches, frontiers and cached link lists hold 4-byte ids in array('i')
+    instead of full URL strings, and URLs are only built for the pages on a
+    returned path. The table itself avoids a Python object per title: titles
+    live back to back in one UTF-8 blob, found through an open-addressing
+    array of ids, for roughly the title's bytes plus 16 per entry.
+
+    Ids are only valid while the table is `in_use`. Past `max_entries`, the
+    table is emptied as soon as nothing is, and holders of ids outside a
+    search (the link caches, the redirect table) drop or rebuild them
+    through `on_reset`.
+    """
+
+    def __init__(self, max_entries=MAX_TITLES):
+        self.max_entries = max_entries
+        self._users = 0
+        self._on_reset = []
+        self._empty()
+
+    def _empty(self):
+        self._blob = bytearray()
+        self._offsets = array("q", [0])
+        self._slots = array("i", [EMPTY_SLOT]) * 1024
+
+    def on_reset(self, callback):
+        """Calls the bound method `callback` whenever the table is emptied, for as long as its object lives."""
+        self._on_reset.append(weakref.WeakMethod(callback))
+
+    @contextmanager
+    def in_use(self):
+        """Wraps a search; ids it holds stay valid until every search has left."""
+        self._users += 1
+        try:
+            yield self
+        finally:
+            self._users -= 1
+            if not self._users and len(self) > self.max_entries:
+                self.reset()
+
+    def reset(self):
+        logger.info(f"Emptying the title table at {len(self)} titles")
+        self._empty()
+        self._on_reset = [ref for ref in self._on_reset if ref() is not None]
+        for ref in self._on_reset:
+            ref()()
+
+    def _find(self, encoded):
+        """(id or EMPTY_SLOT, slot) for `encoded`, probing linearly from its hash."""
+        mask = len(self._slots) - 1
+        slot = hash(encoded) & mask
+        while True:
+            page_id = self._slots[slot]
+            if page_id == EMPTY_SLOT or self._blob[self._offsets[page_id]:self._offsets[page_id + 1]] == encoded:
+                return page_id, slot
+            slot = (slot + 1) & mask
+
+    def _grow(self):
+        self._slots = array("i", [EMPTY_SLOT]) * (len(self._slots) * 2)
+        for page_id in range(len(self)):
+            _, slot = self._find(bytes(self._blob[self._offsets[page_id]:self._offsets[page_id + 1]]))
+            self._slots[slot] = page_id
+
+    def intern(self, title):
+        encoded = title.encode("utf-8")
+        page_id, slot = self._find(encoded)
+        if page_id != EMPTY_SLOT:
+            return page_id
+        page_id = len(self)
+        self._blob += encoded
+        self._offsets.append(len(self._blob))
+        self._slots[slot] = page_id
+        # Keep the table at most half full so probes stay short
+        if 2 * len(self) > len(self._slots):
+            self._grow()
+        return page_id
+
+    def intern_url(self, page):
+        return self.intern(normalize_title(page))
+
+    def title(self, page_id):
+        return self._blob[self._offsets[page_id]:self._offsets[page_id + 1]].decode("utf-8")
+
+    def url(self, page_id):
+        return title_to_url(self.title(page_id))
+
+    def urls(self, page_ids):
+        return [self.url(page_id) for page_id in page_ids]
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+
+title_table = TitleTable()
+
+
+class RedirectResolver:
+    """Remembers redirect title -> target title, learned in bulk from API responses.
+
+    Lookups are plain dict hits, so every discovered link can be folded onto
+    its article before it reaches `visited`. Aliases are also kept by
+    interned id, so link lists cached before a redirect was learned are
+    folded when they are read (see `fold`), and so are titles confirmed not
+    to be redirects, so they are only asked about once.
+    """
+
+    def __init__(self, max_entries=MAX_REDIRECTS):
+        self.max_entries = max_entries
+        self._targets = OrderedDict()
+        # alias id -> target id
+        self._alias_ids = {}
+        # One byte per interned id: 1 once the API has said whether the title is a redirect
+        self._checked = bytearray()
+        title_table.on_reset(self._reindex)
+
+    def learn(self, source, target):
+        if source == target:
+            return
+        self._targets[source] = target
+        self._targets.move_to_end(source)
+        source_id = title_table.intern(source)
+        self._alias_ids[source_id] = title_table.intern(target)
+        self.mark_checked([source_id])
+        while len(self._targets) > self.max_entries:
+            alias, _ = self._targets.popitem(last=False)
+            self._alias_ids.pop(title_table.intern(alias), None)
+
+    def knows(self, title):
+        return title in self._targets
+
+    def resolve(self, title):
+        # Redirects to redirects exist (double redirects); follow a few hops at most
+        for _ in range(3):
+            target = self._targets.get(title)
+            if target is None:
+                break
+            title = target
+        return title
+
+    def resolve_id(self, page_id):
+        for _ in range(3):
+            target = self._alias_ids.get(page_id)
+            if target is None:
+                break
+            page_id = target
+        return page_id
+
+    def fold(self, page_ids):
+        """`page_ids` with known aliases replaced by their articles; the same array if none are aliases."""
+        if not self._alias_ids or self._alias_ids.keys().isdisjoint(page_ids):
+            return page_ids
+        return array("i", dict.fromkeys(map(self.resolve_id, page_ids)))
+
+    def mark_checked(self, page_ids):
+        for page_id in page_ids:
+            if page_id >= len(self._checked):
+                self._checked.extend(bytes(len(title_table) + 1 - len(self._checked)))
+            self._checked[page_id] = 1
+
+    def unchecked(self, page_ids):
+        """The ids in `page_ids` not yet known to be redirects or articles."""
+        checked = self._checked
+        return [page_id for page_id in page_ids if page_id >= len(checked) or not checked[page_id]]
+
+    def canonical_url(self, page):
+        return title_to_url(self.resolve(normalize_title(page)))
+
+    def canonical_ids(self, pages):
+        """Interned ids of the canonical titles of `pages`, de-duplicated, as array('i')."""
+        page_ids = dict.fromkeys(title_table.intern(self.resolve(normalize_title(page))) for page in pages)
+        return array("i", page_ids)
+
+    def _reindex(self):
+        self._alias_ids = {title_table.intern(source): title_table.intern(target) for source, target in self._targets.items()}
+        self._checked = bytearray()
+        self.mark_checked(self._alias_ids)
+
+    def clear(self):
+        self._targets.clear()
+        self._alias_ids.clear()
+        self._checked = bytearray()
+
+    def __len__(self):
+        return len(self._targets)
+
+
+redirects = RedirectResolver()
@@ -0,0 +1,564 @@
+from contextlib import aclosing, asynccontextmanager
+from array import array
+import os
+import time
+import heapq
+import itertools
+import logging
+import asyncio
+from WikiraceAPI.fetchBackends import get_fetch_backend, resolve_redirects, get_redirect_aliases
+from WikiraceAPI.titles import normalize_title, title_to_url, redirects, title_table
+from WikiraceAPI.graphIndex import get_graph_index, OFFLINE_MAX_DEPTH
+from WikiraceAPI.landmarkIndex import get_landmark_index
+from WikiraceAPI.heuristics import TargetProfile
+from WikiraceAPI.httpPool import http_pool
+from WikiraceAPI.pathCache import path_cache_from_env
+from WikiraceAPI.searchMetrics import SearchMetrics, current_metrics
+from WikiraceAPI.frontierStore import FrontierStore, ParentPointers, ROOT
+
+logger = logging.getLogger(__name__)
+
+# ---------- Global Variables ----------
+# Default depth limit; requests may set their own
+MAX_DEPTH = int(os.getenv("MAX_DEPTH", "6"))
+# Pages of a spilled frontier read back and handed to the fetch backend at once
+DEEPENING_CHUNK = int(os.getenv("DEEPENING_CHUNK", "2048"))
+# Pages expanded per round of guided search, and how many rounds it may take
+BEAM_WIDTH = int(os.getenv("GUIDED_BEAM_WIDTH", "10"))
+GUIDED_MAX_ROUNDS = int(os.getenv("GUIDED_MAX_ROUNDS", "30"))
+# Guided priority is score - DEPTH_PENALTY * depth, which keeps paths short
+DEPTH_PENALTY = 0.1
+# Extra hops over the landmark lower bound a stitched start → hub → end path may have
+LANDMARK_TOLERANCE = int(os.getenv("LANDMARK_TOLERANCE", "0"))
+# Solved live searches, shared by every request in the process
+path_cache = path_cache_from_env()
+
+class SearchDeadlineExceeded(Exception):
+    """Raised when a search runs out of time; carries the furthest path it reached."""
+
+    def __init__(self, partial_path, steps):
+        super().__init__(f"Search deadline exceeded after {steps} steps")
+        self.partial_path = partial_path
+        self.steps = steps
+
+class SearchTrail:
+    """How far the running search got, so a partial path can be built once its deadline passes.
+
+    Search functions point `parents` at their parent pointers, and `node`
+    at the page to trace back from when it is not the last one reached,
+    and keep `steps` current. `store` holds the BFS frontiers: budgeted for
+    "deepening", in memory otherwise.
+    """
+
+    def __init__(self, store=None):
+        self.store = store if store is not None else FrontierStore.in_memory()
+        self.parents = None
+        self.node = None
+        self.steps = 0
+
+    def partial_path(self):
+        if self.parents is None:
+            return []
+        return title_table.urls(trace_path(self.parents, self.node if self.node is not None else self.parents.last))
+
+    @asynccontextmanager
+    async def deadline(self, seconds):
+        """Runs the block within `seconds`, then raises SearchDeadlineExceeded; closes the store either way."""
+        try:
+            async with asyncio.timeout(seconds) as timer:
+                yield self
+        except TimeoutError:
+            # Only the deadline itself; a timeout raised by a fetch is an error like any other
+            if not timer.expired():
+                raise
+            logger.warning(f"Search deadline of {seconds}s exceeded after {self.steps} steps")
+            raise SearchDeadlineExceeded(self.partial_path(), self.steps)
+        finally:
+            self.store.close()
+
+def report_progress(progress, **event):
+    """Hands one per-level event (depth, frontier size, pages fetched so far) to `progress` and the search metrics."""
+    metrics = current_metrics.get()
+    if metrics is not None:
+        metrics.level(event)
+    if progress is not None:
+        progress(event)
+
+# ---------- Breadth-First Search ----------
+async def canonical_endpoints(start, end):
+    """Resolves start and end to their articles and learns every redirect to end.
+
+    Discovered links are folded through the same redirect table, so a page
+    linking to an alias of `end` is recognised as reaching it.
+    """
+    start, (end,) = await canonical_targets(start, [end])
+    return start, end
+
+async def canonical_targets(start, ends):
+    """canonical_endpoints for one start and several ends, resolved in as few requests as possible."""
+    session = await http_pool.get_session()
+    titles = await resolve_redirects([normalize_title(start)] + [normalize_title(end) for end in ends], session)
+    await asyncio.gather(*(get_redirect_aliases(title, session) for title in dict.fromkeys(titles[1:])))
+    return title_to_url(titles[0]), [title_to_url(title) for title in titles[1:]]
+
+async def find_wikipedia_path(start, end, mode="bfs", backend=None, deadline=None, beam_width=None, tolerance=None,
+                              progress=None, metrics=None, max_depth=None, frontier_budget_mb=None):
+    """Finds a path of article URLs from start to end.
+
+    Returns the path, [] when none exists, or None when `max_depth` (default
+    MAX_DEPTH) is hit.
+    "guided" trades shortest for fewest fetches and expands `beam_width` pages per round.
+    "deepening" keeps its frontier and parent pointers within `frontier_budget_mb`
+    (default SEARCH_FRONTIER_BUDGET_MB), spilling them to disk past it, for deep
+    searches on small containers.
+    With a `deadline` in seconds for the whole search, resolving the
+    endpoints included, raises SearchDeadlineExceeded once it passes;
+    outstanding fetches are cancelled either way as soon as the search stops.
+    `progress`, if given, is called with an event dict at the start of every level.
+
+    When landmarks are built, a start → hub → end path within `tolerance`
+    hops of the lower bound is returned without searching; otherwise its
+    length caps how deep the search goes.
+
+    Live results are memoized in `path_cache`, along with every suffix.
+
+    Requests, bytes, time and per-level frontier sizes are recorded in
+    `metrics` (a new SearchMetrics if not given) and logged as EMF.
+    """
+    metrics = metrics if metrics is not None else SearchMetrics()
+    metrics.mode = mode
+    # Fetches started by the search, in any task, count towards this search
+    token = current_metrics.set(metrics)
+    outcome = "error"
+    trail = SearchTrail(FrontierStore(frontier_budget_mb) if mode == "deepening" else None)
+    try:
+        with title_table.in_use():
+            async with trail.deadline(deadline):
+                path = await search_wikipedia_path(start, end, mode, backend, beam_width, tolerance, progress, metrics,
+                                                   max_depth, trail)
+        outcome = "found" if path else "depth_limit" if path is None else "not_found"
+        return path
+    except SearchDeadlineExceeded:
+        outcome = "deadline"
+        raise
+    except asyncio.CancelledError:
+        outcome = "cancelled"
+        raise
+    finally:
+        current_metrics.reset(token)
+        metrics.finish(outcome)
+
+async def search_wikipedia_path(start, end, mode, backend, beam_width, tolerance, progress, metrics, max_depth=None,
+                                trail=None):
+    tolerance = LANDMARK_TOLERANCE if tolerance is None else tolerance
+    if mode == "offline":
+        metrics.source = "offline"
+        return find_wikipedia_path_offline(start, end, tolerance)
+    fetch_backend = get_fetch_backend(backend)
+    metrics.backend = fetch_backend.name
+    # Guided search settles for any path; the other modes promise a shortest one
+    shortest = mode != "guided"
+    # Redirects learned earlier usually canonicalize a popular pair without any request
+    known_start, known_end = redirects.canonical_url(start), redirects.canonical_url(end)
+    cached = path_cache.get(known_start, known_end, shortest, count_miss=False)
+    if cached is None:
+        start, end = await canonical_endpoints(start, end)
+        cached = path_cache.get(start, end, shortest)
+    if cached is not None:
+        logger.info(f"Answered from the path cache: {len(cached) - 1} hops")
+        metrics.source = "path_cache"
+        return cached
+    max_depth = max_depth or MAX_DEPTH
+    landmark_path = None
+    estimate = await live_landmark_path(start, end, fetch_backend)
+    if estimate is not None:
+        lower, landmark_path = estimate
+        if len(landmark_path) - 1 <= lower + tolerance:
+            logger.info(f"Answered from landmarks: {len(landmark_path) - 1} hops, lower bound {lower}")
+            path_cache.set(landmark_path, shortest=len(landmark_path) - 1 == lower)
+            metrics.source = "landmarks"
+            return landmark_path
+        # Only a strictly shorter path is worth searching for
+        max_depth = min(max_depth, len(landmark_path) - 2)
+    start, end = title_table.intern_url(start), title_table.intern_url(end)
+    if mode == "bidirectional":
+        path = await find_wikipedia_path_bidirectional(start, end, fetch_backend, max_depth, progress, trail)
+    elif mode == "guided":
+        path = await find_wikipedia_path_guided(start, end, fetch_backend, beam_width, max_depth, progress, trail)
+    else:
+        # "deepening" is the same BFS, over the budgeted store find_wikipedia_path gave the trail
+        path = await find_wikipedia_path_bfs(start, end, fetch_backend, max_depth, progress, trail)
+    if not path and landmark_path:
+        path = landmark_path
+    if path:
+        # Backward search through a sample of a hub's backlinks may have missed a shorter path
+        path_cache.set(path, shortest and not metrics.counters["sampled_backlinks"])
+    return path
+
+async def find_wikipedia_path_bfs(start, end, fetch_backend, max_depth=None, progress=None, trail=None):
+    """BFS between two page ids; returns the path as URLs.
+
+    The frontier and parent pointers live in the trail's store: in memory,
+    or for "deepening" a budgeted FrontierStore that spills them to
+    memory-mapped files. Each level resumes from the frontier the last one
+    left, and a spilled level is read back and fetched DEEPENING_CHUNK
+    pages at a time, so a level of millions of pages is never copied into
+    memory at once.
+    """
+    logger.info(f"Starting BFS from {title_table.title(start)} to {title_table.title(end)} using the {fetch_backend.name} backend")
+    max_depth = max_depth or MAX_DEPTH
+    search_start_time = time.time()
+    if start == end:
+        return title_table.urls([start])
+    trail = trail if trail is not None else SearchTrail()
+    store = trail.store
+    # Each page remembers only the page it was reached from; paths are rebuilt on success
+    parents = trail.parents = store.parents(start)
+    frontier = store.frontier([start])
+    steps = 0
+    fetched = 0
+    session = await http_pool.get_session()
+    while len(frontier):
+        current_level = frontier
+        frontier = store.frontier()
+        steps = trail.steps = steps + 1
+        logger.info(f"Processing BFS depth {steps} with {len(current_level)} nodes, {store.spilled_bytes} bytes spilled")
+        report_progress(progress, depth=steps, frontier=len(current_level), pages_fetched=fetched,
+                        spilled_bytes=store.spilled_bytes)
+        for chunk in current_level.chunks(DEEPENING_CHUNK):
+            async with aclosing(fetch_backend.iter_links(chunk, session)) as results:
+                async for page_id, links in results:
+                    # Goal test on discovery: no need to wait for the rest of the level
+                    if end in links:
+                        parents[end] = page_id
+                        logger.info(f"Found path in {time.time() - search_start_time:.2f}s and {steps} steps.")
+                        return title_table.urls(trace_path(parents, end))
+
+                    for link in links:
+                        if link not in parents:
+                            parents[link] = page_id
+                            frontier.append(link)
+            fetched += len(chunk)
+        store.release(current_level)
+        if steps >= max_depth:
+            logger.warning(f"Search terminated after {steps} steps due to excessive depth.")
+            return None
+    logger.warning(f"No path found after {steps} steps in {time.time() - search_start_time:.2f}s")
+    return []
+
+def trace_path(parents, node):
+    path = []
+    while node != ROOT:
+        path.append(node)
+        node = parents[node]
+    path.reverse()
+    return path
+
+# ---------- Bidirectional Search ----------
+def join_paths(meeting_point, forward_parents, backward_parents):
+    path = trace_path(forward_parents, meeting_point)
+    node = backward_parents[meeting_point]
+    while node != ROOT:
+        path.append(node)
+        node = backward_parents[node]
+    return path
+
+async def expand_frontier(parents, other_parents, results):
+    """Expands one whole level; returns (next_frontier, meeting_point or None)."""
+    next_frontier = array("i")
+    async with aclosing(results) as results:
+        async for page_id, links in results:
+            for link in links:
+                if link in parents:
+                    continue
+                parents[link] = page_id
+                if link in other_parents:
+                    return next_frontier, link
+                next_frontier.append(link)
+    return next_frontier, None
+
+async def find_wikipedia_path_bidirectional(start, end, fetch_backend, max_depth=None, progress=None, trail=None):
+    """Bidirectional BFS between two page ids; returns the path as URLs."""
+    logger.info(f"Starting bidirectional BFS from {title_table.title(start)} to {title_table.title(end)} using the {fetch_backend.name} backend")
+    max_depth = max_depth or MAX_DEPTH
+    search_start_time = time.time()
+    if start == end:
+        return title_table.urls([start])
+    # Forward parents follow outgoing links, backward parents follow "what links here"
+    trail = trail if trail is not None else SearchTrail()
+    forward_parents = trail.parents = ParentPointers(start)
+    backward_parents = ParentPointers(end)
+    forward_frontier = array("i", [start])
+    backward_frontier = array("i", [end])
+    steps = 0
+    fetched = 0
+    session = await http_pool.get_session()
+    while forward_frontier and backward_frontier:
+        steps = trail.steps = steps + 1
+        if steps > max_depth:
+            logger.warning(f"Search terminated after {steps - 1} steps due to excessive depth.")
+            return None
+        # Always grow the cheaper side so neither frontier explodes
+        if len(forward_frontier) <= len(backward_frontier):
+            logger.info(f"Processing forward depth {steps} with {len(forward_frontier)} nodes")
+            report_progress(progress, depth=steps, direction="forward", frontier=len(forward_frontier), pages_fetched=fetched)
+            fetched += len(forward_frontier)
+            forward_frontier, meeting_point = await expand_frontier(
+                forward_parents, backward_parents, fetch_backend.iter_links(forward_frontier, session))
+        else:
+            logger.info(f"Processing backward depth {steps} with {len(backward_frontier)} nodes")
+            report_progress(progress, depth=steps, direction="backward", frontier=len(backward_frontier), pages_fetched=fetched)
+            fetched += len(backward_frontier)
+            backward_frontier, meeting_point = await expand_frontier(
+                backward_parents, forward_parents, fetch_backend.iter_backlinks(backward_frontier, session))
+        if meeting_point is not None:
+            logger.info(f"Found path in {time.time() - search_start_time:.2f}s and {steps} steps.")
+            return title_table.urls(join_paths(meeting_point, forward_parents, backward_parents))
+    logger.warning(f"No path found after {steps} steps in {time.time() - search_start_time:.2f}s")
+    return []
+
+# ---------- Guided Search ----------
+async def collect(results):
+    async with aclosing(results) as results:
+        return {page_id: links async for page_id, links in results}
+
+async def find_wikipedia_path_guided(start, end, fetch_backend, beam_width=None, max_depth=None, progress=None,
+                                     trail=None):
+    """Beam best-first search: each round expands the `beam_width` most promising pages.
+
+    Pages are ranked by TargetProfile against the target's links and backlinks.
+    Reaching any backlink of `end` finishes the search, so paths are short
+    but not always shortest. Takes page ids; returns the path as URLs.
+    """
+    beam_width = beam_width or BEAM_WIDTH
+    max_depth = max_depth or MAX_DEPTH
+    logger.info(f"Starting guided search from {title_table.title(start)} to {title_table.title(end)} (beam {beam_width}) "
+                f"using the {fetch_backend.name} backend")
+    search_start_time = time.time()
+    if start == end:
+        return title_table.urls([start])
+    trail = trail if trail is not None else SearchTrail()
+    parents = trail.parents = ParentPointers(start)
+    # Entries are (-priority, tie-breaker, depth, page id); the tie-breaker keeps discovery order
+    order = itertools.count()
+    heap = [(0.0, next(order), 0, start)]
+    # A partial path ends at the best page expanded so far rather than the last one reached
+    trail.node = start
+    truncated = False
+    steps = 0
+    fetched = 0
+    session = await http_pool.get_session()
+    links = await collect(fetch_backend.iter_links([end], session))
+    backlinks = await collect(fetch_backend.iter_backlinks([end], session))
+    profile = TargetProfile(end, links.get(end, ()), backlinks.get(end, ()))
+    while heap:
+        steps = trail.steps = steps + 1
+        if steps > GUIDED_MAX_ROUNDS:
+            logger.warning(f"Guided search gave up after {steps - 1} rounds")
+            return None
+        beam = [heapq.heappop(heap) for _ in range(min(beam_width, len(heap)))]
+        depths = {page_id: depth for _, _, depth, page_id in beam}
+        trail.node = beam[0][3]
+        logger.info(f"Processing guided round {steps} with {len(beam)} nodes")
+        report_progress(progress, depth=steps, frontier=len(heap) + len(beam), pages_fetched=fetched)
+        fetched += len(beam)
+        async with aclosing(fetch_backend.iter_links(list(depths), session)) as results:
+            async for page_id, links in results:
+                profile.observe(links)
+                overlap = profile.link_overlap(links)
+                depth = depths[page_id] + 1
+                for link in links:
+                    if link in parents:
+                        continue
+                    parents[link] = page_id
+                    if link == end or link in profile.backlinks:
+                        if link != end:
+                            parents[end] = link
+                        logger.info(f"Found path in {time.time() - search_start_time:.2f}s and {steps} rounds.")
+                        return title_table.urls(trace_path(parents, end))
+                    # A page at max_depth - 1 could only finish through a backlink, checked above
+                    if depth >= max_depth - 1:
+                        truncated = True
+                        continue
+                    priority = profile.score(link, overlap) - DEPTH_PENALTY * depth
+                    heapq.heappush(heap, (-priority, next(order), depth, link))
+    logger.warning(f"No path found after {steps} rounds in {time.time() - search_start_time:.2f}s")
+    return None if truncated else []
+
+# ---------- Multi-Target Search ----------
+async def find_wikipedia_paths(start, ends, backend=None, deadline=None, progress=None, metrics=None, max_depth=None):
+    """Shortest paths from one start to several ends, with a single BFS.
+
+    Returns a dict mapping each of `ends`, as given, to what
+    find_wikipedia_path would return for it: a path, [] or None. Ends still
+    unreached when the `deadline` passes map to a SearchDeadlineExceeded.
+    Pairs already in `path_cache` are answered from it.
+    """
+    metrics = metrics if metrics is not None else SearchMetrics()
+    metrics.mode = "multi"
+    token = current_metrics.set(metrics)
+    outcome = "error"
+    # Paths land here as they are found, so those survive the deadline
+    paths = {}
+    trail = SearchTrail()
+    try:
+        with title_table.in_use():
+            try:
+                async with trail.deadline(deadline):
+                    await search_wikipedia_paths(start, ends, backend, progress, metrics, max_depth, paths, trail)
+            except SearchDeadlineExceeded as e:
+                paths.update((end, e) for end in ends if end not in paths)
+        outcome = "found" if all(isinstance(path, list) and path for path in paths.values()) else "partial"
+        return paths
+    except asyncio.CancelledError:
+        outcome = "cancelled"
+        raise
+    finally:
+        current_metrics.reset(token)
+        metrics.finish(outcome)
+
+async def search_wikipedia_paths(start, ends, backend, progress, metrics, max_depth=None, paths=None, trail=None):
+    paths = paths if paths is not None else {}
+    fetch_backend = get_fetch_backend(backend)
+    metrics.backend = fetch_backend.name
+    known_start = redirects.canonical_url(start)
+    for end in ends:
+        cached = path_cache.get(known_start, redirects.canonical_url(end), count_miss=False)
+        if cached is not None:
+            paths[end] = cached
+    remaining = [end for end in dict.fromkeys(ends) if end not in paths]
+    if not remaining:
+        metrics.source = "path_cache"
+        return paths
+    start, canonical_ends = await canonical_targets(start, remaining)
+    # Several ends may be aliases of one article
+    targets = {}
+    for end, canonical_end in zip(remaining, canonical_ends):
+        cached = path_cache.get(start, canonical_end)
+        if cached is not None:
+            paths[end] = cached
+        else:
+            targets.setdefault(title_table.intern_url(canonical_end), []).append(end)
+    if targets:
+        await find_wikipedia_paths_bfs(title_table.intern_url(start), targets, fetch_backend, paths, max_depth, progress,
+                                       trail)
+    return paths
+
+async def find_wikipedia_paths_bfs(start, targets, fetch_backend, paths, max_depth=None, progress=None, trail=None):
+    """BFS from one page id until every id in `targets` is reached.
+
+    `targets` maps each page id to the ends asking for it; each end gets its
+    URL path in `paths` as soon as it is found, or [] or None once the
+    search runs out of pages or depth.
+    """
+    logger.info(f"Starting BFS from {title_table.title(start)} to {len(targets)} targets using the {fetch_backend.name} backend")
+    max_depth = max_depth or MAX_DEPTH
+    search_start_time = time.time()
+    trail = trail if trail is not None else SearchTrail()
+    parents = trail.parents = ParentPointers(start)
+    remaining = set(targets)
+
+    def reached(end_id):
+        remaining.discard(end_id)
+        path = title_table.urls(trace_path(parents, end_id))
+        path_cache.set(path)
+        paths.update((end, path) for end in targets[end_id])
+
+    if start in remaining:
+        reached(start)
+    queue = array("i", [start])
+    steps = 0
+    fetched = 0
+    session = await http_pool.get_session()
+    while queue and remaining:
+        current_level = queue
+        queue = array("i")
+        steps = trail.steps = steps + 1
+        logger.info(f"Processing BFS depth {steps} with {len(current_level)} nodes, {len(remaining)} targets left")
+        report_progress(progress, depth=steps, frontier=len(current_level), pages_fetched=fetched, targets_left=len(remaining))
+        async with aclosing(fetch_backend.iter_links(current_level, session)) as results:
+            async for page_id, links in results:
+                for link in links:
+                    if link in parents:
+                        continue
+                    parents[link] = page_id
+                    queue.append(link)
+                    if link in remaining:
+                        reached(link)
+                if not remaining:
+                    break
+        fetched += len(current_level)
+        if remaining and steps >= max_depth:
+            logger.warning(f"Search terminated after {steps} steps due to excessive depth.")
+            paths.update((end, None) for end_id in remaining for end in targets[end_id])
+            return paths
+    logger.info(f"Found {len(targets) - len(remaining)} of {len(targets)} paths in {time.time() - search_start_time:.2f}s and {steps} steps.")
+    paths.update((end, []) for end_id in remaining for end in targets[end_id])
+    return paths
+
+# ---------- Landmark Shortcut ----------
+def landmark_estimate(graph_index, start_id, end_id):
+    """(lower bound, start → hub → end id path) from the landmark index, or None."""
+    landmark_index = get_landmark_index(graph_index)
+    if landmark_index is None:
+        return None
+    lower, upper, hub = landmark_index.bounds(start_id, end_id)
+    if upper is None:
+        return None
+    return lower, landmark_index.stitched_path(start_id, end_id, hub)
+
+async def live_landmark_path(start, end, fetch_backend):
+    """Landmark estimate for a live search, with every hop checked against live links.
+
+    The landmarks come from an offline snapshot, so a link may have been
+    removed since; one batched fetch of the path's pages rules that out.
+    """
+    graph_index = get_graph_index()
+    if graph_index is None or get_landmark_index(graph_index) is None:
+        return None
+    start_id = graph_index.lookup(normalize_title(start))
+    end_id = graph_index.lookup(normalize_title(end))
+    if start_id is None or end_id is None:
+        return None
+    estimate = landmark_estimate(graph_index, start_id, end_id)
+    if estimate is None:
+        return None
+    lower, path = estimate
+    # Graph index ids and interned ids are different numberings of the same titles
+    path = [title_table.intern(graph_index.title(page_id)) for page_id in path]
+    session = await http_pool.get_session()
+    links = await collect(fetch_backend.iter_links(path[:-1], session))
+    if not all(next_page in links.get(page, ()) for page, next_page in zip(path, path[1:])):
+        logger.info("Landmark path is stale, searching instead")
+        return None
+    return lower, title_table.urls(path)
+
+# ---------- Offline Graph Search ----------
+def find_wikipedia_path_offline(start, end, tolerance=LANDMARK_TOLERANCE):
+    """Searches the memory-mapped graph index without any outbound requests."""
+    graph_index = get_graph_index()
+    if graph_index is None:
+        raise RuntimeError("GRAPH_INDEX_PATH is not configured")
+    search_start_time = time.time()
+    start_id = graph_index.lookup(normalize_title(start))
+    end_id = graph_index.lookup(normalize_title(end))
+    if start_id is None or end_id is None:
+        logger.warning(f"{start if start_id is None else end} is not in the graph index")
+        return []
+    path = landmark_path = None
+    max_depth = OFFLINE_MAX_DEPTH
+    estimate = landmark_estimate(graph_index, start_id, end_id)
+    if estimate is not None:
+        lower, landmark_path = estimate
+        if len(landmark_path) - 1 <= lower + tolerance:
+            path = landmark_path
+        else:
+            max_depth = len(landmark_path) - 2
+    if path is None:
+        path = graph_index.find_path(start_id, end_id, max_depth)
+        if not path and landmark_path:
+            path = landmark_path
+    logger.info(f"Offline search finished in {(time.time() - search_start_time) * 1000:.1f}ms")
+    if not path:
+        return path
+    return [title_to_url(graph_index.title(page_id)) for page_id in path]